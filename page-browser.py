@@ -14,26 +14,221 @@ import shutil
 import signal
 import sys
 import socket
+import sqlite3
+import struct
 import threading
+from collections import OrderedDict
+
+# Link rewriting shared with page-downloader.py's --store-rewritten
+import page_rewrite
+from page_rewrite import REWRITE_VERSION, rewrite_css_url, rewrite_resource_links
 
 def get_script_directory():
     """Get the directory where the script is located"""
     return os.path.dirname(os.path.abspath(__file__))
 
+def normalize_index_url(url):
+    """Scheme-agnostic form of a URL used as the persistent index key"""
+    if url.startswith('https://'):
+        return url[8:]
+    if url.startswith('http://'):
+        return url[7:]
+    return url
+
+def rewrite_links(html, base_url):
+    """Rewrite links in HTML to work with offline browser"""
+    try:
+        return page_rewrite.rewrite_links(html, base_url)
+    except Exception as e:
+        print(f"❌ Error rewriting links: {e}")
+        return html  # Return original HTML if rewriting fails
+
+def rewrite_stylesheet(css, css_url):
+    """Rewrite url() and @import references of a stylesheet body (bytes) to use asset server"""
+    # surrogateescape keeps bytes that aren't UTF-8 unchanged
+    css_text = css.decode('utf-8', errors='surrogateescape')
+    return page_rewrite.rewrite_stylesheet(css_text, css_url).encode('utf-8', errors='surrogateescape')
+
+def is_stylesheet(url, content_type):
+    return 'text/css' in (content_type or '') or urlparse(url).path.endswith('.css')
+
+class RenderedPageCache:
+    """Byte-bounded LRU cache of rewritten, encoded page and stylesheet bodies"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body, evict=True):
+        """Cache a body, evicting the least recently used ones to stay under max_bytes
+
+        With evict=False a body that only fits by evicting others is not
+        stored. Returns True if the body was cached.
+        """
+        if len(body) > self.max_bytes:
+            return False
+        with self.lock:
+            old = self.entries.get(key)
+            old_size = len(old) if old is not None else 0
+            if not evict and self.size - old_size + len(body) > self.max_bytes:
+                return False
+            if old is not None:
+                del self.entries[key]
+                self.size -= old_size
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+            return True
+
+class PersistentPageIndex:
+    """SQLite-backed URL index so warm restarts only re-scan changed archives"""
+    SCHEMA_VERSION = 2
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            # Index files are only a cache - rebuild on schema changes
+            self.conn.executescript('''
+                DROP TABLE IF EXISTS archives;
+                DROP TABLE IF EXISTS entries;
+            ''')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS archives (
+                path TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                norm_url TEXT NOT NULL,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                archive TEXT NOT NULL,
+                member TEXT NOT NULL,
+                content_type TEXT,
+                rewritten_member TEXT
+            );
+            CREATE INDEX IF NOT EXISTS entries_archive ON entries(archive);
+            CREATE INDEX IF NOT EXISTS entries_norm_url ON entries(norm_url);
+        ''')
+        self.conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        self.conn.commit()
+
+    def lookup_archive(self, path, mtime, size):
+        """Return cached metadata for an archive if its mtime and size are unchanged"""
+        row = self.conn.execute(
+            'SELECT mtime, size, metadata FROM archives WHERE path = ?', (path,)
+        ).fetchone()
+        if row and row[0] == mtime and row[1] == size:
+            return json.loads(row[2])
+        return None
+
+    def load_entries(self, path):
+        """Return (pages, assets) index entries stored for an archive"""
+        pages = {}
+        assets = {}
+        rows = self.conn.execute(
+            'SELECT url, kind, member, content_type, rewritten_member FROM entries WHERE archive = ?', (path,)
+        )
+        for url, kind, member, content_type, rewritten_member in rows:
+            target = pages if kind == 'page' else assets
+            target[url] = {
+                'url': url,
+                'kind': kind,
+                'member': member,
+                'content_type': content_type or '',
+                'page_file': path
+            }
+            if rewritten_member:
+                target[url]['rewritten_member'] = rewritten_member
+        return pages, assets
+
+    def store_archive(self, path, mtime, size, metadata, pages, assets):
+        """Replace the stored entries for an archive"""
+        with self.conn:
+            self.conn.execute('DELETE FROM entries WHERE archive = ?', (path,))
+            self.conn.execute(
+                'INSERT OR REPLACE INTO archives (path, mtime, size, metadata) VALUES (?, ?, ?, ?)',
+                (path, mtime, size, json.dumps(metadata, ensure_ascii=False))
+            )
+            rows = []
+            for kind, entries in (('page', pages), ('asset', assets)):
+                for url, entry in entries.items():
+                    rows.append((normalize_index_url(url), url, kind, path, entry['member'],
+                                 entry.get('content_type', ''), entry.get('rewritten_member')))
+            self.conn.executemany(
+                'INSERT INTO entries (norm_url, url, kind, archive, member, content_type, rewritten_member) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', rows
+            )
+
+    def prune(self, existing_paths):
+        """Forget archives that are no longer on disk"""
+        existing = set(existing_paths)
+        stale = [row[0] for row in self.conn.execute('SELECT path FROM archives')
+                 if row[0] not in existing]
+        with self.conn:
+            for path in stale:
+                self.conn.execute('DELETE FROM entries WHERE archive = ?', (path,))
+                self.conn.execute('DELETE FROM archives WHERE path = ?', (path,))
+        return len(stale)
+
+    def close(self):
+        self.conn.close()
+
 class PageFileBrowser:
-    def __init__(self, pages_directory=None):
+    def __init__(self, pages_directory=None, lazy=False, index_path=None, blob_store=None,
+                 page_cache_mb=64):
         # Always look in script directory by default
         script_dir = get_script_directory()
         if pages_directory is None:
             self.pages_directory = os.path.join(script_dir, "downloaded_sites")
         else:
             self.pages_directory = os.path.abspath(pages_directory)
-            
+
         print(f"📁 Script location: {script_dir}")
         print(f"📁 Browser looking for .page files in: {self.pages_directory}")
         self.loaded_sites = {}
         self.youtube_videos = []
-        
+
+        # Lazy mode only keeps a URL -> (archive, member) index in memory
+        # and reads page/asset bodies from the archive when requested
+        self.lazy = lazy
+        self.open_archives = {}
+        self.archives_lock = threading.Lock()
+
+        # Persistent URL index (lazy mode only) so restarts skip unchanged archives
+        if lazy and index_path is None:
+            index_path = os.path.join(self.pages_directory, '.page_index.sqlite')
+        self.index_path = index_path if lazy else None
+
+        # Shared blob store for archives whose bodies live outside the .page
+        # file (format v4); overrides the location recorded in each archive
+        self.blob_store = os.path.abspath(blob_store) if blob_store else None
+        self.archive_blob_stores = {}
+        self.reset_lookup_indexes()
+
+        # (offset, size) of uncompressed videos served directly from their .page
+        self.video_locations = {}
+
+        # Rewritten pages and stylesheets keyed by URL and archive version (0 MB disables)
+        self.page_cache = RenderedPageCache(page_cache_mb * 1024 * 1024) if page_cache_mb > 0 else None
+        self.archive_versions = {}
+        # Archives whose stored rewritten copies match this browser's rewriting
+        self.prerewritten_archives = set()
+
         # Create temp directory for extracted videos when browser runs
         self.temp_dir = tempfile.mkdtemp(prefix="youtube_browser_")
         print(f"📁 Temp directory for videos: {self.temp_dir}")
@@ -46,13 +241,283 @@ class PageFileBrowser:
         
     def __del__(self):
         """Clean up temp directory when browser is destroyed"""
+        self.close_archives()
         if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
             try:
                 shutil.rmtree(self.temp_dir)
                 print(f"🧹 Cleaned up temp directory: {self.temp_dir}")
             except Exception as e:
                 print(f"⚠️ Could not clean up temp directory: {e}")
-    
+
+    def get_archive(self, filepath):
+        """Get an open ZipFile for a .page file, reusing the handle across requests"""
+        with self.archives_lock:
+            zipf = self.open_archives.get(filepath)
+            if zipf is None:
+                zipf = zipfile.ZipFile(filepath, 'r')
+                self.open_archives[filepath] = zipf
+            return zipf
+
+    def close_archives(self):
+        """Close every archive handle opened in lazy mode"""
+        if not hasattr(self, 'open_archives'):
+            return
+        with self.archives_lock:
+            for zipf in self.open_archives.values():
+                try:
+                    zipf.close()
+                except Exception:
+                    pass
+            self.open_archives.clear()
+
+    def load_entry(self, entry):
+        """Return full page/asset data for an index entry, reading it from the archive if needed"""
+        if entry is None or 'content' in entry:
+            return entry
+
+        try:
+            zipf = self.get_archive(entry['page_file'])
+            return self.read_entry(zipf, entry)
+        except Exception as e:
+            print(f"❌ Error reading {entry.get('member')} from {entry.get('page_file')}: {e}")
+            return None
+
+    def register_archive_version(self, filepath, metadata, stat=None):
+        """Remember an archive's mtime and size, so cached renderings of a replaced archive are not reused"""
+        stat = stat or os.stat(filepath)
+        self.archive_versions[filepath] = (stat.st_mtime_ns, stat.st_size)
+        if metadata.get('rewrite_version') == REWRITE_VERSION:
+            self.prerewritten_archives.add(filepath)
+
+    def get_rewritten_member(self, entry):
+        """Member holding the stored rewritten copy of an entry, if it can be served"""
+        member = entry.get('rewritten_member')
+        if member and entry.get('page_file') in self.prerewritten_archives:
+            return member
+        return None
+
+    def read_rewritten_page(self, entry):
+        """Page body rewritten at save time, or None if the archive has none"""
+        if 'rewritten_content' in entry:
+            return entry['rewritten_content']
+        member = self.get_rewritten_member(entry)
+        if not member:
+            return None
+        try:
+            return self.read_member(self.get_archive(entry['page_file']), member)
+        except Exception as e:
+            print(f"⚠️ Could not read rewritten copy of {entry['url']}: {e}")
+            return None
+
+    def page_cache_key(self, entry):
+        return ('page', entry['url'], entry.get('page_file'),
+                self.archive_versions.get(entry.get('page_file')))
+
+    def build_page(self, entry):
+        """Rewritten page body as bytes, bypassing the cache"""
+        # Pages rewritten at save time only need to be read
+        body = self.read_rewritten_page(entry)
+        if body is None:
+            page_data = self.load_entry(entry)
+            if page_data is None:
+                return None
+            body = rewrite_links(page_data['content'], page_data['url']).encode('utf-8')
+        return body
+
+    def render_page(self, entry):
+        """Rewritten page body as bytes, from the cache when this archive version was rendered before"""
+        if self.page_cache is None:
+            return self.build_page(entry)
+
+        key = self.page_cache_key(entry)
+        body = self.page_cache.get(key)
+        if body is None:
+            body = self.build_page(entry)
+            if body is not None:
+                self.page_cache.put(key, body)
+        return body
+
+    def render_stylesheet(self, asset_data, body):
+        """Stylesheet body with its references rewritten, cached like pages
+
+        Archives saved with --store-rewritten already hold rewritten
+        stylesheets, which are returned unchanged.
+        """
+        if asset_data.get('rewritten') or not is_stylesheet(asset_data['url'], asset_data.get('content_type')):
+            return body
+
+        key = None
+        if self.page_cache is not None:
+            page_file = asset_data.get('page_file')
+            key = ('css', asset_data['url'], page_file, self.archive_versions.get(page_file))
+            cached = self.page_cache.get(key)
+            if cached is not None:
+                return cached
+
+        rewritten = rewrite_stylesheet(body, asset_data['url'])
+        if key is not None:
+            self.page_cache.put(key, rewritten)
+        return rewritten
+
+    def prewarm_page_cache(self):
+        """Render pages into the cache in the background until the next one would evict another"""
+        if self.page_cache is None:
+            return
+
+        def prewarm():
+            rendered = 0
+            for entry in list(self.page_index.values()):
+                try:
+                    key = self.page_cache_key(entry)
+                    if self.page_cache.get(key) is not None:
+                        continue
+                    body = self.build_page(entry)
+                    if body is None:
+                        continue
+                    if not self.page_cache.put(key, body, evict=False):
+                        break
+                    rendered += 1
+                except Exception as e:
+                    print(f"⚠️ Could not prewarm {entry.get('url')}: {e}")
+            print(f"🔥 Prewarmed {rendered} pages ({self.page_cache.size // 1024} KB)")
+
+        threading.Thread(target=prewarm, daemon=True).start()
+
+    def register_blob_store(self, filepath, metadata):
+        """Remember where an archive keeps its shared blobs"""
+        if metadata.get('blob_store'):
+            archive_dir = os.path.dirname(os.path.abspath(filepath))
+            self.archive_blob_stores[filepath] = os.path.normpath(
+                os.path.join(archive_dir, metadata['blob_store']))
+
+    def read_member(self, zipf, member):
+        """Read a member from the archive or, for shared blobs, from the blob store"""
+        blob_store = self.blob_store or self.archive_blob_stores.get(zipf.filename)
+        if blob_store and member.startswith('blobs/'):
+            digest = member[len('blobs/'):]
+            blob_path = os.path.join(blob_store, digest[:2], digest)
+            if os.path.exists(blob_path):
+                with open(blob_path, 'rb') as f:
+                    return f.read()
+        return zipf.read(member)
+
+    def read_entry(self, zipf, entry):
+        """Read page/asset data for an index entry from any .page layout"""
+        member = entry['member']
+        rewritten_member = self.get_rewritten_member(entry)
+        if rewritten_member and entry.get('kind') != 'page':
+            # Stylesheets rewritten at save time replace the original
+            member = rewritten_member
+        body = self.read_member(zipf, member)
+
+        # Format v2 wraps every page/asset in its own JSON document
+        if member.endswith('.json'):
+            data = json.loads(body.decode('utf-8'))
+            data['page_file'] = entry.get('page_file')
+            return data
+
+        # Format v3+ stores the raw body, everything else lives in the manifest
+        data = {
+            'url': entry['url'],
+            'content_type': entry.get('content_type', ''),
+            'page_file': entry.get('page_file')
+        }
+        if entry.get('kind') == 'page':
+            data['content'] = body.decode('utf-8', errors='replace')
+            if rewritten_member:
+                data['rewritten_content'] = self.read_member(zipf, rewritten_member)
+        else:
+            data['content'] = body
+            data['encoding'] = 'binary'
+            if rewritten_member:
+                data['rewritten'] = True
+        return data
+
+    def build_site_index(self, zipf, filepath):
+        """Build URL -> archive member index for a website .page file without keeping bodies"""
+        pages = {}
+        assets = {}
+
+        if 'manifest.json' in zipf.namelist():
+            # Newer archives list every URL and its member up front
+            manifest = json.loads(zipf.read('manifest.json').decode('utf-8'))
+            for key, kind, target in (('pages', 'page', pages), ('assets', 'asset', assets)):
+                for url, info in manifest.get(key, {}).items():
+                    target[url] = {
+                        'url': url,
+                        'kind': kind,
+                        'member': info['member'],
+                        'content_type': info.get('content_type', ''),
+                        'page_file': filepath
+                    }
+                    if 'rewritten_member' in info:
+                        target[url]['rewritten_member'] = info['rewritten_member']
+            return pages, assets
+
+        # Older archives have no manifest - read each member once and drop the body
+        print(f"    ℹ️ No manifest in {os.path.basename(filepath)}, indexing members (slower)")
+        for file_info in zipf.filelist:
+            name = file_info.filename
+            if not name.endswith('.json'):
+                continue
+            if name.startswith('pages/'):
+                target, kind = pages, 'page'
+            elif name.startswith('assets/'):
+                target, kind = assets, 'asset'
+            else:
+                continue
+            data = json.loads(zipf.read(name).decode('utf-8'))
+            target[data['url']] = {
+                'url': data['url'],
+                'kind': kind,
+                'member': name,
+                'content_type': data.get('content_type', ''),
+                'page_file': filepath
+            }
+            del data
+
+        return pages, assets
+
+    def locate_stored_video(self, page_path):
+        """
+        Byte range of an uncompressed video member inside a .page file.
+
+        Returns (offset, size) so the video can be served straight from the
+        archive, or None if it is compressed (or missing) and has to be
+        extracted first.
+        """
+        with self.archives_lock:
+            if page_path in self.video_locations:
+                return self.video_locations[page_path]
+
+        location = None
+        try:
+            with zipfile.ZipFile(page_path, 'r') as zipf:
+                video_info = None
+                for file_info in zipf.filelist:
+                    if file_info.filename == 'video.mp4' or file_info.filename.endswith('.mp4'):
+                        video_info = file_info
+                        break
+
+            # Encrypted members can't be read in place either
+            if (video_info and video_info.compress_type == zipfile.ZIP_STORED
+                    and not video_info.flag_bits & 0x1):
+                with open(page_path, 'rb') as f:
+                    f.seek(video_info.header_offset)
+                    local_header = f.read(30)
+                # The data follows the local header, whose name/extra
+                # lengths may differ from the central directory's
+                if local_header[:4] == b'PK\x03\x04':
+                    name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+                    offset = video_info.header_offset + 30 + name_length + extra_length
+                    location = (offset, video_info.file_size)
+        except Exception as e:
+            print(f"⚠️ Could not locate video in {page_path}: {e}")
+
+        with self.archives_lock:
+            self.video_locations[page_path] = location
+        return location
+
     def extract_video_from_page(self, page_path, video_id):
         """Extract video from .page file to temp directory"""
         try:
@@ -72,7 +537,7 @@ class PageFileBrowser:
                         # Extract video to temp directory
                         with zipf.open(file_info.filename) as video_file:
                             with open(video_temp_path, 'wb') as f:
-                                f.write(video_file.read())
+                                shutil.copyfileobj(video_file, f, 1024 * 1024)
                         video_found = True
                         print(f"🎬 Extracted video to temp: {video_temp_path}")
                         break
@@ -95,17 +560,24 @@ class PageFileBrowser:
                 if 'metadata.json' in zipf.namelist():
                     metadata_str = zipf.read('metadata.json').decode('utf-8')
                     metadata = json.loads(metadata_str)
+                    self.register_blob_store(filepath, metadata)
+                    self.register_archive_version(filepath, metadata)
                     
                     # Check if it's a YouTube video
                     if metadata.get('type') == 'youtube_video':
                         video_id = metadata.get('video_id', 'unknown')
                         video_title = metadata.get('title', 'Unknown Title')
                         
-                        # Extract video to temp directory
-                        video_temp_path = self.extract_video_from_page(filepath, video_id)
-                        if not video_temp_path:
-                            print(f"⚠️ Could not extract video: {video_id}")
-                            return None
+                        if self.lazy or self.locate_stored_video(filepath):
+                            # Stored videos are served from the archive, the rest
+                            # is extracted on first playback instead of at startup
+                            video_temp_path = os.path.join(self.temp_dir, f"{video_id}.mp4")
+                        else:
+                            # Extract video to temp directory
+                            video_temp_path = self.extract_video_from_page(filepath, video_id)
+                            if not video_temp_path:
+                                print(f"⚠️ Could not extract video: {video_id}")
+                                return None
                         
                         # Read HTML and modify it to use temp video
                         if 'index.html' in zipf.namelist():
@@ -133,7 +605,9 @@ class PageFileBrowser:
                                 'pages': {domain: page_data},
                                 'assets': {},
                                 'is_youtube': True,
-                                'video_temp_path': video_temp_path
+                                'video_temp_path': video_temp_path,
+                                'video_id': video_id,
+                                'page_file': filepath
                             }
                             
                             self.loaded_sites[domain] = site_data
@@ -150,24 +624,51 @@ class PageFileBrowser:
                             
                             print(f"✅ Loaded YouTube video: {video_title}")
                             return site_data
+                    elif self.lazy:
+                        # Regular website - index URLs only, bodies are read on demand
+                        pages, assets = self.build_site_index(zipf, filepath)
+
+                        site_data = {
+                            'metadata': metadata,
+                            'pages': pages,
+                            'assets': assets,
+                            'is_youtube': False,
+                            'page_file': filepath
+                        }
+
+                        domain = metadata.get('main_url', 'unknown_site')
+                        self.loaded_sites[domain] = site_data
+                        print(f"✅ Indexed site: {domain} with {len(pages)} pages, {len(assets)} assets")
+                        return site_data
                     else:
                         # Regular website - load pages and assets
                         pages = {}
                         assets = {}
+
+                        if 'manifest.json' in zipf.namelist():
+                            # Read every body listed in the manifest (v2 JSON or raw members)
+                            page_index, asset_index = self.build_site_index(zipf, filepath)
+                            for url, entry in page_index.items():
+                                pages[url] = self.read_entry(zipf, entry)
+                            for url, entry in asset_index.items():
+                                assets[url] = self.read_entry(zipf, entry)
+                        else:
+                            # Read pages
+                            for file_info in zipf.filelist:
+                                if file_info.filename.startswith('pages/') and file_info.filename.endswith('.json'):
+                                    page_data_str = zipf.read(file_info.filename).decode('utf-8')
+                                    page_data = json.loads(page_data_str)
+                                    pages[page_data['url']] = page_data
                         
-                        # Read pages
-                        for file_info in zipf.filelist:
-                            if file_info.filename.startswith('pages/') and file_info.filename.endswith('.json'):
-                                page_data_str = zipf.read(file_info.filename).decode('utf-8')
-                                page_data = json.loads(page_data_str)
-                                pages[page_data['url']] = page_data
+                            # Read assets
+                            for file_info in zipf.filelist:
+                                if file_info.filename.startswith('assets/') and file_info.filename.endswith('.json'):
+                                    asset_data_str = zipf.read(file_info.filename).decode('utf-8')
+                                    asset_data = json.loads(asset_data_str)
+                                    assets[asset_data['url']] = asset_data
                         
-                        # Read assets
-                        for file_info in zipf.filelist:
-                            if file_info.filename.startswith('assets/') and file_info.filename.endswith('.json'):
-                                asset_data_str = zipf.read(file_info.filename).decode('utf-8')
-                                asset_data = json.loads(asset_data_str)
-                                assets[asset_data['url']] = asset_data
+                        for data in list(pages.values()) + list(assets.values()):
+                            data['page_file'] = filepath
                         
                         site_data = {
                             'metadata': metadata,
@@ -199,10 +700,33 @@ class PageFileBrowser:
                     page_files.append(os.path.join(root, file))
         
         print(f"📄 Found {len(page_files)} .page files:")
+        index = self.open_persistent_index()
+        reused = 0
         for filepath in page_files:
             relative_path = os.path.relpath(filepath, self.pages_directory)
+            if index:
+                stat = os.stat(filepath)
+                if self.load_from_persistent_index(index, filepath, stat):
+                    reused += 1
+                    continue
             print(f"  • Loading: {relative_path}")
-            self.load_page_file(filepath)
+            site_data = self.load_page_file(filepath)
+            if index and site_data and not site_data.get('is_youtube', False):
+                try:
+                    index.store_archive(filepath, stat.st_mtime, stat.st_size,
+                                        site_data['metadata'], site_data['pages'], site_data['assets'])
+                except sqlite3.Error as e:
+                    print(f"⚠️ Could not update index for {relative_path}: {e}")
+
+        if index:
+            try:
+                pruned = index.prune(page_files)
+                if pruned:
+                    print(f"🧹 Removed {pruned} missing archives from index")
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not prune index: {e}")
+            index.close()
+            print(f"♻️ Reused index for {reused}/{len(page_files)} archives")
         
         # Print summary
         regular_sites = sum(1 for s in self.loaded_sites.values() if not s.get('is_youtube', False))
@@ -210,77 +734,169 @@ class PageFileBrowser:
         
         print(f"✅ Total sites loaded: {regular_sites} regular sites")
         print(f"✅ YouTube videos loaded: {youtube_videos}")
+
+        self.build_lookup_indexes()
     
+    def open_persistent_index(self):
+        """Open the on-disk URL index, or return None if it is disabled or unusable"""
+        if not self.index_path:
+            return None
+        try:
+            index = PersistentPageIndex(self.index_path)
+            print(f"🗂️ Using URL index: {self.index_path}")
+            return index
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not open URL index {self.index_path}: {e}")
+            return None
+
+    def load_from_persistent_index(self, index, filepath, stat):
+        """Register a website archive from the on-disk index if it hasn't changed"""
+        try:
+            metadata = index.lookup_archive(filepath, stat.st_mtime, stat.st_size)
+            if metadata is None:
+                return False
+            pages, assets = index.load_entries(filepath)
+        except sqlite3.Error as e:
+            print(f"⚠️ URL index lookup failed for {filepath}: {e}")
+            return False
+
+        self.register_blob_store(filepath, metadata)
+        self.register_archive_version(filepath, metadata, stat)
+        domain = metadata.get('main_url', 'unknown_site')
+        self.loaded_sites[domain] = {
+            'metadata': metadata,
+            'pages': pages,
+            'assets': assets,
+            'is_youtube': False,
+            'page_file': filepath
+        }
+        return True
+
+    def reset_lookup_indexes(self):
+        """Empty the global URL indexes used by the find_* lookups"""
+        self.page_index = {}
+        self.page_norm_index = {}
+        self.page_path_index = {}
+        self.page_host_index = {}
+        self.asset_index = {}
+        self.asset_norm_index = {}
+        self.asset_basename_index = {}
+        self.asset_suffix_trie = {}
+        self.fallback_cache = {}
+
+    def build_lookup_indexes(self):
+        """Precompute the global URL indexes used by the find_* lookups"""
+        self.reset_lookup_indexes()
+
+        # Sites are indexed in load order and the first match wins,
+        # same as the old linear scans
+        for site_data in self.loaded_sites.values():
+            if site_data.get('is_youtube', False):
+                continue
+
+            for page_url, page_data in site_data['pages'].items():
+                parsed = urlparse(page_url)
+                self.page_index.setdefault(page_url, page_data)
+                self.page_norm_index.setdefault(normalize_index_url(page_url), page_data)
+                if parsed.path:
+                    self.page_path_index.setdefault(parsed.path, page_data)
+                self.page_host_index.setdefault(parsed.netloc, []).append((parsed.path, page_data))
+
+            for asset_url, asset_data in site_data['assets'].items():
+                path = urlparse(asset_url).path
+                self.asset_index.setdefault(asset_url, asset_data)
+                self.asset_norm_index.setdefault(normalize_index_url(asset_url), asset_data)
+                filename = os.path.basename(path)
+                if filename:
+                    self.asset_basename_index.setdefault(filename, asset_data)
+
+                # Trie keyed by path segments from the end, so any trailing
+                # part of an asset path (font.woff2, latest/font.woff2, ...)
+                # resolves with one walk
+                node = self.asset_suffix_trie
+                for segment in reversed(path.lstrip('/').split('/')):
+                    node = node.setdefault(segment, {})
+                    node.setdefault(None, asset_data)
+
+        print(f"🗂️ Indexed {len(self.page_index)} pages and {len(self.asset_index)} assets for lookup")
+
+    def cached_fallback(self, key, compute):
+        """Memoize the slower partial-match lookups, including misses"""
+        try:
+            return self.fallback_cache[key]
+        except KeyError:
+            pass
+        result = compute()
+        if len(self.fallback_cache) >= 10000:
+            self.fallback_cache.clear()
+        self.fallback_cache[key] = result
+        return result
+
     def find_page_by_url(self, url):
         """Find a page across all loaded sites by URL"""
+        return self.load_entry(self.find_page_entry(url))
+
+    def find_page_entry(self, url):
+        """Find the index entry of a page by URL without reading its body"""
         # Check for YouTube video requests
         if url.startswith('youtube_'):
-            for domain, site_data in self.loaded_sites.items():
-                if domain == url:
-                    return next(iter(site_data['pages'].values()))
-        
+            site_data = self.loaded_sites.get(url)
+            if site_data:
+                return next(iter(site_data['pages'].values()))
+
         # Exact match
-        for site_data in self.loaded_sites.values():
-            if url in site_data['pages']:
-                return site_data['pages'][url]
+        page_data = self.page_index.get(url)
+        if page_data:
+            return page_data
 
         # Try without protocol
-        if url.startswith('http://'):
-            alt_url = url.replace('http://', 'https://', 1)
-            for site_data in self.loaded_sites.values():
-                if alt_url in site_data['pages']:
-                    return site_data['pages'][alt_url]
-        elif url.startswith('https://'):
-            alt_url = url.replace('https://', 'http://', 1)
-            for site_data in self.loaded_sites.values():
-                if alt_url in site_data['pages']:
-                    return site_data['pages'][alt_url]
+        if url.startswith(('http://', 'https://')):
+            page_data = self.page_norm_index.get(normalize_index_url(url))
+            if page_data:
+                return page_data
 
         # Try to find by path or domain
-        for site_data in self.loaded_sites.values():
-            for page_url, page_data in site_data['pages'].items():
-                # Match by exact path
-                parsed_request = urlparse(url)
-                parsed_page = urlparse(page_url)
+        parsed_request = urlparse(url)
 
-                # Match by exact path
-                if parsed_request.path and parsed_request.path == parsed_page.path:
-                    return page_data
+        # Match by exact path
+        if parsed_request.path:
+            page_data = self.page_path_index.get(parsed_request.path)
+            if page_data:
+                return page_data
 
-                # Match domain and similar path
-                if (parsed_request.netloc == parsed_page.netloc and 
-                    parsed_request.path in parsed_page.path):
-                    return page_data
+        # Match domain and similar path
+        host_pages = self.page_host_index.get(parsed_request.netloc)
+        if host_pages:
+            def match_similar_path():
+                for page_path, candidate in host_pages:
+                    if parsed_request.path in page_path:
+                        return candidate
+                return None
+            page_data = self.cached_fallback(('page', url), match_similar_path)
+            if page_data:
+                return page_data
 
         return None
 
     def find_asset_by_url(self, url):
         """Find an asset across all loaded sites by URL"""
         # Exact match
-        for site_data in self.loaded_sites.values():
-            if url in site_data['assets']:
-                return site_data['assets'][url]
+        asset_data = self.asset_index.get(url)
+        if asset_data:
+            return self.load_entry(asset_data)
 
         # Try without protocol
-        if url.startswith('http://'):
-            alt_url = url.replace('http://', 'https://', 1)
-            for site_data in self.loaded_sites.values():
-                if alt_url in site_data['assets']:
-                    return site_data['assets'][alt_url]
-        elif url.startswith('https://'):
-            alt_url = url.replace('https://', 'http://', 1)
-            for site_data in self.loaded_sites.values():
-                if alt_url in site_data['assets']:
-                    return site_data['assets'][alt_url]
+        if url.startswith(('http://', 'https://')):
+            asset_data = self.asset_norm_index.get(normalize_index_url(url))
+            if asset_data:
+                return self.load_entry(asset_data)
 
         # Try by filename
         requested_filename = os.path.basename(urlparse(url).path)
         if requested_filename:
-            for site_data in self.loaded_sites.values():
-                for asset_url, asset_data in site_data['assets'].items():
-                    asset_filename = os.path.basename(urlparse(asset_url).path)
-                    if asset_filename == requested_filename:
-                        return asset_data
+            asset_data = self.asset_basename_index.get(requested_filename)
+            if asset_data:
+                return self.load_entry(asset_data)
         
         return None
     
@@ -289,20 +905,15 @@ class PageFileBrowser:
         # Remove leading slash if present
         if path.startswith('/'):
             path = path[1:]
-        
-        # Try to find asset by matching the end of the URL
-        for site_data in self.loaded_sites.values():
-            for asset_url, asset_data in site_data['assets'].items():
-                parsed = urlparse(asset_url)
-                asset_path = parsed.path
-                if asset_path.startswith('/'):
-                    asset_path = asset_path[1:]
-                
-                # Check if the path ends with our requested path
-                if asset_url.endswith(path) or asset_path == path:
-                    return asset_data
-        
-        return None
+
+        # Walk the suffix trie from the last path segment backwards
+        node = self.asset_suffix_trie
+        for segment in reversed(path.split('/')):
+            node = node.get(segment)
+            if node is None:
+                return None
+
+        return self.load_entry(node.get(None))
 
 class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
     page_browser = None
@@ -426,28 +1037,9 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
                 self.send_error(404, f"Asset not found: {path}")
                 return
             
-            # Determine content type
-            content_type = asset_data.get('content_type', 'application/octet-stream')
-            encoding = asset_data.get('encoding', 'text')
-            content = asset_data['content']
+            size = self.send_asset(asset_data)
             
-            self.send_response(200)
-            self.send_header('Content-type', content_type)
-            self.send_header('Cache-Control', 'public, max-age=3600')
-            
-            if encoding == 'base64':
-                # Decode base64 content
-                binary_content = base64.b64decode(content)
-                self.send_header('Content-Length', str(len(binary_content)))
-                self.end_headers()
-                self.wfile.write(binary_content)
-            else:
-                # Text content
-                self.send_header('Content-Length', str(len(content)))
-                self.end_headers()
-                self.wfile.write(content.encode('utf-8'))
-            
-            print(f"✅ Served direct asset: {path} ({len(content)} bytes)")
+            print(f"✅ Served direct asset: {path} ({size} bytes)")
             
         except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
             # Client disconnected, ignore
@@ -484,28 +1076,9 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
                 self.send_error(404, f"Asset not found: {asset_url}")
                 return
             
-            # Determine content type
-            content_type = asset_data.get('content_type', 'application/octet-stream')
-            encoding = asset_data.get('encoding', 'text')
-            content = asset_data['content']
-            
-            self.send_response(200)
-            self.send_header('Content-type', content_type)
-            self.send_header('Cache-Control', 'public, max-age=3600')
-            
-            if encoding == 'base64':
-                # Decode base64 content
-                binary_content = base64.b64decode(content)
-                self.send_header('Content-Length', str(len(binary_content)))
-                self.end_headers()
-                self.wfile.write(binary_content)
-            else:
-                # Text content
-                self.send_header('Content-Length', str(len(content)))
-                self.end_headers()
-                self.wfile.write(content.encode('utf-8'))
+            size = self.send_asset(asset_data)
             
-            print(f"✅ Served encoded asset: {asset_url} ({len(content)} bytes)")
+            print(f"✅ Served encoded asset: {asset_url} ({size} bytes)")
 
         except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
             # Client disconnected, ignore
@@ -519,6 +1092,33 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
             except:
                 pass
     
+    def send_asset(self, asset_data):
+        """Send a stored asset, decoding it according to how it was archived"""
+        content_type = asset_data.get('content_type') or 'application/octet-stream'
+        encoding = asset_data.get('encoding', 'text')
+        content = asset_data['content']
+
+        if encoding == 'binary':
+            # Format v3 - raw bytes straight from the archive
+            body = content
+        elif encoding == 'base64':
+            # Format v2 - base64 inside JSON
+            body = base64.b64decode(content)
+        else:
+            # Text content
+            body = content.encode('utf-8')
+
+        # Stylesheet references go straight to the /asset/ route
+        body = self.page_browser.render_stylesheet(asset_data, body)
+
+        self.send_response(200)
+        self.send_header('Content-type', content_type)
+        self.send_header('Cache-Control', 'public, max-age=3600')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
     def serve_temp_video(self, path):
         """Serve video files from temp directory with robust error handling"""
         try:
@@ -535,6 +1135,18 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
                     temp_path = site_data.get('video_temp_path', '')
                     if os.path.basename(temp_path) == video_filename:
                         video_path = temp_path
+                        page_file = site_data.get('page_file')
+                        # Uncompressed videos are sent straight from the archive
+                        location = self.page_browser.locate_stored_video(page_file) if page_file else None
+                        if location:
+                            with open(page_file, 'rb') as f:
+                                self.send_video(f, *location)
+                            print(f"✅ Served video from archive: {video_filename}")
+                            return
+                        # Lazy mode extracts the video on first playback
+                        if not os.path.exists(video_path) and page_file:
+                            video_path = self.page_browser.extract_video_from_page(
+                                page_file, site_data['video_id'])
                         break
             
             if not video_path or not os.path.exists(video_path):
@@ -542,81 +1154,8 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
                 self.send_error(404, f"Video not found: {video_filename}")
                 return
             
-            # Get file size
-            file_size = os.path.getsize(video_path)
-            
-            # Check for Range header (for video seeking)
-            range_header = self.headers.get('Range', '')
-            range_start = 0
-            range_end = file_size - 1
-            
-            if range_header:
-                # Parse Range header
-                range_match = re.search(r'bytes=(\d+)-(\d*)', range_header)
-                if range_match:
-                    range_start = int(range_match.group(1))
-                    if range_match.group(2):
-                        range_end = int(range_match.group(2))
-                    else:
-                        range_end = file_size - 1
-                    
-                    # Ensure range is valid
-                    if range_start >= file_size:
-                        self.send_error(416, 'Requested Range Not Satisfiable')
-                        return
-                    range_end = min(range_end, file_size - 1)
-            
-            # Open file for reading
             with open(video_path, 'rb') as f:
-                # Handle range request
-                if range_header:
-                    self.send_response(206)  # Partial Content
-                    self.send_header('Content-type', 'video/mp4')
-                    self.send_header('Content-Range', f'bytes {range_start}-{range_end}/{file_size}')
-                    self.send_header('Content-Length', str(range_end - range_start + 1))
-                    self.send_header('Accept-Ranges', 'bytes')
-                    self.send_header('Cache-Control', 'no-cache')
-                    self.end_headers()
-                    
-                    # Seek to start position
-                    f.seek(range_start)
-                    
-                    # Stream the file in chunks
-                    remaining = range_end - range_start + 1
-                    chunk_size = 8192
-                    
-                    while remaining > 0:
-                        try:
-                            chunk = f.read(min(chunk_size, remaining))
-                            if not chunk:
-                                break
-                            self.wfile.write(chunk)
-                            remaining -= len(chunk)
-                        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
-                            # Client disconnected, stop streaming
-                            print(f"⚠️ Client disconnected while streaming video")
-                            break
-                else:
-                    # Full file request
-                    self.send_response(200)
-                    self.send_header('Content-type', 'video/mp4')
-                    self.send_header('Content-Length', str(file_size))
-                    self.send_header('Accept-Ranges', 'bytes')
-                    self.send_header('Cache-Control', 'no-cache')
-                    self.end_headers()
-                    
-                    # Stream the file in chunks
-                    chunk_size = 8192
-                    while True:
-                        try:
-                            chunk = f.read(chunk_size)
-                            if not chunk:
-                                break
-                            self.wfile.write(chunk)
-                        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
-                            # Client disconnected, stop streaming
-                            print(f"⚠️ Client disconnected while streaming video")
-                            break
+                self.send_video(f, 0, os.path.getsize(video_path))
             
             print(f"✅ Served temp video: {video_filename}")
             
@@ -632,6 +1171,59 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
             except:
                 pass  # Client may have disconnected
     
+    def send_video(self, f, offset, file_size):
+        """
+        Send file_size bytes of f starting at offset as video/mp4, honouring Range.
+
+        The body is handed to socket.sendfile, which copies it in the kernel
+        where os.sendfile is available and falls back to send() elsewhere.
+        """
+        # Check for Range header (for video seeking)
+        range_header = self.headers.get('Range', '')
+        range_start = 0
+        range_end = file_size - 1
+        
+        if range_header:
+            # Parse Range header: bytes=START-[END] or a suffix bytes=-LENGTH
+            range_match = re.search(r'bytes=(\d*)-(\d*)', range_header)
+            if range_match and range_match.group(1):
+                range_start = int(range_match.group(1))
+                if range_match.group(2):
+                    range_end = min(int(range_match.group(2)), file_size - 1)
+            elif range_match and range_match.group(2):
+                range_start = max(0, file_size - int(range_match.group(2)))
+            else:
+                range_header = ''
+            
+            # Ensure range is valid
+            if range_header and (range_start >= file_size or range_end < range_start):
+                self.send_response(416)  # Requested Range Not Satisfiable
+                self.send_header('Content-Range', f'bytes */{file_size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        
+        if range_header:
+            self.send_response(206)  # Partial Content
+            self.send_header('Content-Range', f'bytes {range_start}-{range_end}/{file_size}')
+        else:
+            # Full file request
+            self.send_response(200)
+        self.send_header('Content-type', 'video/mp4')
+        self.send_header('Content-Length', str(max(0, range_end - range_start + 1)))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        length = range_end - range_start + 1
+        if length <= 0:
+            return
+        try:
+            self.connection.sendfile(f, offset + range_start, length)
+        except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError, TimeoutError):
+            # Client disconnected, stop streaming
+            print(f"⚠️ Client disconnected while streaming video")
+
     def serve_index(self):
         """Serve an index page listing all loaded sites"""
         try:
@@ -1067,21 +1659,21 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
             print(f"🔍 Looking for page: {requested_url}")
             
             # Find the page in loaded sites
-            page_data = self.page_browser.find_page_by_url(requested_url)
+            page_entry = self.page_browser.find_page_entry(requested_url)
             
-            if page_data:
-                content = page_data['content']
-                
-                # Fix links in the content to work with our offline browser
-                content = self.rewrite_links(content, page_data['url'])
-                
+            # Links are rewritten to work with our offline browser, or taken
+            # from the cache of already rewritten pages
+            content = self.page_browser.render_page(page_entry) if page_entry else None
+            
+            if content is not None:
                 # Set proper headers
                 self.send_response(200)
-                content_type = page_data.get('content_type', 'text/html')
+                content_type = page_entry.get('content_type') or 'text/html'
                 self.send_header('Content-type', content_type)
+                self.send_header('Content-Length', str(len(content)))
                 self.end_headers()
                 
-                self.wfile.write(content.encode('utf-8'))
+                self.wfile.write(content)
                 print(f"✅ Served page: {requested_url}")
             else:
                 print(f"❌ Page not found: {requested_url}")
@@ -1140,101 +1732,15 @@ class RobustPageFileRequestHandler(SimpleHTTPRequestHandler):
     
     def rewrite_links(self, html, base_url):
         """Rewrite links in HTML to work with offline browser"""
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-            base_domain = urlparse(base_url).netloc
-
-            # Rewrite <a> tags
-            for link in soup.find_all('a', href=True):
-                href = link['href']
-                if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                    if href.startswith(('http://', 'https://')):
-                        # External link from same domain
-                        if base_domain in href:
-                            link['href'] = f"/page/{href}"
-                    elif href.startswith('/'):
-                        # Absolute path - convert to full URL
-                        full_url = f"{urlparse(base_url).scheme}://{base_domain}{href}"
-                        link['href'] = f"/page/{full_url}"
-                    else:
-                        # Relative path
-                        full_url = urljoin(base_url, href)
-                        link['href'] = f"/page/{full_url}"
-
-            # Rewrite resource links to use our asset server
-            self.rewrite_resource_links(soup, base_url)
-
-            return str(soup)
-        except Exception as e:
-            print(f"❌ Error rewriting links: {e}")
-            return html  # Return original HTML if rewriting fails
+        return rewrite_links(html, base_url)
 
     def rewrite_resource_links(self, soup, base_url):
         """Rewrite resource links (CSS, JS, images) to use asset server"""
-        try:
-            base_domain = urlparse(base_url).netloc
-            
-            # Rewrite <script> tags
-            for script in soup.find_all('script', src=True):
-                src = script['src']
-                if src and not src.startswith(('data:', 'blob:', 'javascript:')):
-                    if src.startswith(('http://', 'https://')):
-                        script['src'] = f"/asset/{src}"
-                    else:
-                        full_src = urljoin(base_url, src)
-                        script['src'] = f"/asset/{full_src}"
-
-            # Rewrite <link> tags (CSS, etc.)
-            for link in soup.find_all('link', href=True):
-                href = link['href']
-                if href and not href.startswith(('data:', 'blob:')):
-                    if href.startswith(('http://', 'https://')):
-                        link['href'] = f"/asset/{href}"
-                    else:
-                        full_href = urljoin(base_url, href)
-                        link['href'] = f"/asset/{full_href}"
-
-            # Rewrite <img> tags
-            for img in soup.find_all('img', src=True):
-                src = img['src']
-                if src and not src.startswith(('data:', 'blob:')):
-                    if src.startswith(('http://', 'https://')):
-                        img['src'] = f"/asset/{src}"
-                    else:
-                        full_src = urljoin(base_url, src)
-                        img['src'] = f"/asset/{full_src}"
-
-            # Rewrite CSS url() references in style tags
-            for style in soup.find_all('style'):
-                if style.string:
-                    style.string = re.sub(
-                        r'url\([\'"]?([^)\'"]+)[\'"]?\)',
-                        lambda m: self.rewrite_css_url(m.group(1), base_url),
-                        style.string
-                    )
-
-            # Rewrite CSS in style attributes
-            for tag in soup.find_all(style=True):
-                if tag['style']:
-                    tag['style'] = re.sub(
-                        r'url\([\'"]?([^)\'"]+)[\'"]?\)',
-                        lambda m: self.rewrite_css_url(m.group(1), base_url),
-                        tag['style']
-                    )
-                    
-        except Exception as e:
-            print(f"❌ Error rewriting resource links: {e}")
+        rewrite_resource_links(soup, base_url)
 
     def rewrite_css_url(self, url, base_url):
         """Rewrite a CSS URL to use asset server"""
-        if url.startswith(('data:', 'blob:')):
-            return f'url({url})'
-
-        if url.startswith(('http://', 'https://')):
-            return f'url(/asset/{url})'
-        else:
-            full_url = urljoin(base_url, url)
-            return f'url(/asset/{full_url})'
+        return rewrite_css_url(url, base_url)
     
     def log_message(self, format, *args):
         """Override to reduce log spam"""
@@ -1263,7 +1769,8 @@ class ThreadingHTTPServer(HTTPServer):
         except Exception as e:
             print(f"⚠️ Error in request thread: {e}")
 
-def start_browser(pages_directory=None, port=8000):
+def start_browser(pages_directory=None, port=8000, lazy=False, index_path=None, use_index=True,
+                  blob_store=None, page_cache_mb=64, prewarm=False):
     """Start the web browser server with robust error handling"""
     # Set up signal handler for Ctrl+C
     signal.signal(signal.SIGINT, signal_handler)
@@ -1277,7 +1784,10 @@ def start_browser(pages_directory=None, port=8000):
     print(f"🔍 Looking for .page files in: {pages_directory}")
     
     # Create and configure the browser
-    browser = PageFileBrowser(pages_directory)
+    browser = PageFileBrowser(pages_directory, lazy=lazy, index_path=index_path, blob_store=blob_store,
+                              page_cache_mb=page_cache_mb)
+    if not use_index:
+        browser.index_path = None
     browser.load_all_page_files()
     
     if not browser.loaded_sites:
@@ -1288,6 +1798,8 @@ def start_browser(pages_directory=None, port=8000):
 
     # Set up the request handler
     RobustPageFileRequestHandler.page_browser = browser
+    if prewarm:
+        browser.prewarm_page_cache()
     
     # Change to script directory to avoid serving system files
     os.chdir(script_dir)
@@ -1336,6 +1848,7 @@ def start_browser(pages_directory=None, port=8000):
         # Clean up
         if server:
             server.server_close()
+        browser.close_archives()
         # Clean up temp directory
         if hasattr(browser, 'temp_dir') and os.path.exists(browser.temp_dir):
             try:
@@ -1351,10 +1864,28 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Offline Website Browser')
     parser.add_argument('--port', type=int, default=8000, help='Port to run the server on')
     parser.add_argument('--directory', help='Directory containing .page files')
+    parser.add_argument('--lazy', action='store_true',
+                        help='Only index URLs at startup and read pages/assets from the archives on demand')
+    parser.add_argument('--index-file',
+                        help='Persistent URL index used by --lazy (default: DIRECTORY/.page_index.sqlite)')
+    parser.add_argument('--no-index', action='store_true',
+                        help='Do not use or update the persistent URL index in --lazy mode')
+    parser.add_argument('--blob-store',
+                        help='Shared blob store directory (default: the one recorded in each archive)')
+    parser.add_argument('--page-cache-mb', type=int, default=64,
+                        help='Memory for rewritten pages kept between requests, 0 disables the cache (default: 64)')
+    parser.add_argument('--prewarm', action='store_true',
+                        help='Rewrite pages into the page cache in the background after loading')
     
     args = parser.parse_args()
     
     start_browser(
         pages_directory=args.directory,
-        port=args.port
+        port=args.port,
+        lazy=args.lazy,
+        index_path=args.index_file,
+        use_index=not args.no_index,
+        blob_store=args.blob_store,
+        page_cache_mb=args.page_cache_mb,
+        prewarm=args.prewarm
     )
@@ -15,7 +15,8 @@ import sys
 from collections import deque
 import random
 from fake_useragent import UserAgent
-import gzip
+# Not used directly: requests decodes br bodies only when brotli is installed,
+# and the session advertises br in Accept-Encoding
 import brotli
 from PIL import Image
 import io
@@ -26,10 +27,40 @@ from typing import List, Dict, Optional
 import logging
 import signal
 import shutil
+import tempfile
+from functools import lru_cache
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+import multiprocessing
+import asyncio
+import importlib.util
+from email.utils import parsedate_to_datetime
+from urllib.robotparser import RobotFileParser
+
+# Link rewriting shared with page-browser.py (--store-rewritten)
+import page_rewrite
+from page_rewrite import REWRITE_VERSION, rewrite_stylesheet
+
+# Optional asyncio HTTP engine (--http-engine httpx), HTTP/2 needs h2 as well
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+# Optional faster HTML backend for BeautifulSoup (--parser lxml)
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
+# httpx logs every request at INFO level
+logging.getLogger('httpx').setLevel(logging.WARNING)
 
 # Add signal handling for Ctrl+C
 stop_requested = False
@@ -42,6 +73,9 @@ def signal_handler(sig, frame):
 # Register the signal handler
 signal.signal(signal.SIGINT, signal_handler)
 
+# Sites crawled in parallel (--parallel-sites) take turns at the console
+console_input_lock = threading.Lock()
+
 
 class YouTubeSuggestionsExtractor:
     """
@@ -865,10 +899,10 @@ class YouTubeDownloader:
                 html_content = self.create_embedded_page(video_data, page_number)
                 zipf.writestr('index.html', html_content.encode('utf-8'))
                 
-                # Save video file directly
+                # Save video file directly, uncompressed so it can be played from the archive
                 video_file = video_data['video_file']
                 if os.path.exists(video_file):
-                    zipf.write(video_file, 'video.mp4')
+                    zipf.write(video_file, 'video.mp4', compress_type=member_compression('video.mp4'))
                 
                 # Save video info if exists
                 info_file = video_data.get('info_file')
@@ -883,7 +917,8 @@ class YouTubeDownloader:
                 if thumb_file and os.path.exists(thumb_file):
                     with open(thumb_file, 'rb') as f:
                         thumb_data = f.read()
-                        zipf.writestr('thumbnail' + os.path.splitext(thumb_file)[1], thumb_data)
+                        thumb_name = 'thumbnail' + os.path.splitext(thumb_file)[1]
+                        zipf.writestr(thumb_name, thumb_data, compress_type=member_compression(thumb_name))
             
             print(f"💾 Saved: {filename}")
             return filepath
@@ -964,348 +999,1604 @@ class YouTubeDownloader:
         return downloaded_files
 
 
-class CompleteWebsiteDownloader:
-    def __init__(self, output_dir=None, max_pages=10, skip_assets=False):
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        if output_dir is None:
-            self.output_dir = os.path.join(script_dir, "downloaded_sites")
-        else:
-            self.output_dir = os.path.abspath(output_dir)
-            
-        print(f"📁 Save location: {self.output_dir}")
-        
-        self.max_pages = max_pages
-        self.skip_assets = skip_assets
-        
-        # Initialize YouTube downloader with enhanced suggestions
-        youtube_output_dir = os.path.join(self.output_dir, "youtube_videos")
-        self.youtube_downloader = YouTubeDownloader(
-            output_dir=youtube_output_dir,
-            max_pages=self.max_pages
-        )
-        
-        # Initialize session with better headers
-        self.session = requests.Session()
-        self.ua = UserAgent()
-        self.update_session_headers()
-        
-        self.driver = None
-        self.visited_urls = set()
-        self.pages_to_crawl = deque()
-        self.failed_urls = set()
-        self.crawl_delay = random.uniform(1, 2)
-        self.max_retries = 3
-        
-        # Asset type priorities
-        self.critical_assets = ['.css', '.js']
-        self.important_assets = ['.png', '.jpg', '.jpeg', '.svg', '.ico', '.woff', '.woff2', '.ttf']
-        self.other_assets = ['.gif', '.webp', '.mp4', '.webm', '.json', '.xml']
-        
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir, exist_ok=True)
-            print(f"✅ Created directory: {self.output_dir}")
+class HostRateLimiter:
+    """
+    Per-host token bucket used for every request the website crawler sends.
 
-    def is_valid_url(self, url):
-        """RELAXED URL validation - only filter obvious junk"""
-        if not url or not isinstance(url, str):
-            return False
-            
-        # Skip obviously invalid URLs - MUCH MORE PERMISSIVE
-        obvious_junk_patterns = [
-            r'^[a-f0-9]{64}$',  # SHA256 hashes
-            r'^[a-f0-9]{40}$',  # SHA1 hashes  
-            r'^[a-zA-Z0-9+/]{40,}={0,2}$',  # Long base64 strings
-            r'^[\w\s-]+\s+[\w\s-]+$',  # Plain text with spaces (like "width=device-width")
-            r'^:[\w]+\(.*\)$',  # Rails-style routes like ":solution(.:format)"
-            r'^@\w+$',  # Twitter handles
-        ]
-        
-        for pattern in obvious_junk_patterns:
-            if re.match(pattern, url.strip()):
-                return False
-        
-        # Must have a valid scheme and netloc for HTTP URLs
-        try:
-            parsed = urlparse(url)
-            
-            # Skip data URLs and javascript
-            if parsed.scheme in ['data', 'javascript', 'mailto', 'tel']:
-                return False
-                
-            # For HTTP URLs, require netloc
-            if parsed.scheme in ['http', 'https']:
-                if not parsed.netloc:
-                    return False
-                    
-            return True
-            
-        except Exception:
-            return False
+    Each host gets its own bucket, so CDN asset hosts are not slowed down by
+    the origin's limits. Rates adapt to the server: fast successful responses
+    raise the rate, 429/503 and errors halve it and pause the host (honoring
+    Retry-After), and a robots.txt Crawl-delay caps it.
+    """
 
-    def is_likely_asset_url(self, url):
-        """Check if URL is likely a downloadable asset - MORE PERMISSIVE"""
-        # Always allow URLs with common file extensions
-        valid_extensions = self.critical_assets + self.important_assets + self.other_assets
-        
-        # Check file extensions
-        if any(url.lower().endswith(ext) for ext in valid_extensions):
-            return True
-            
-        # Check common asset patterns
-        asset_patterns = [
-            r'\.(css|js|png|jpg|jpeg|gif|svg|ico|woff|ttf|webp)(\?.*)?$',
-            r'/static/',
-            r'/assets/',
-            r'/images/',
-            r'/fonts/',
-            r'/css/',
-            r'/js/',
-            r'\.min\.(js|css)',
-        ]
-        
-        # If it passes basic URL validation and looks like a resource, allow it
-        if any(re.search(pattern, url, re.IGNORECASE) for pattern in asset_patterns):
-            return True
-            
-        # For CSS Zen Garden specifically, be more permissive
-        if 'csszengarden.com' in url:
-            return True
-            
-        return False
+    def __init__(self, rate=2.0, max_rate=8.0, min_rate=0.2, burst=2):
+        self.default_rate = rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.hosts = {}
+        self.lock = threading.Lock()
 
-    def should_download_url(self, url):
-        """Main decision function for whether to download a URL"""
-        if not self.is_valid_url(url):
-            return False
-            
-        # Always download pages
-        if any(url.endswith(ext) for ext in ['', '.html', '.htm', '.php', '.aspx']):
-            return True
-            
-        # Download assets
-        if self.is_likely_asset_url(url):
-            return True
-            
-        # For URLs we're unsure about, check if they look like web resources
+    def _get_bucket(self, host):
+        bucket = self.hosts.get(host)
+        if bucket is None:
+            bucket = {
+                'rate': self.default_rate,
+                'max_rate': self.max_rate,
+                'burst': self.burst,
+                'tokens': float(self.burst),
+                'updated': time.monotonic(),
+                'blocked_until': 0.0,
+                'strikes': 0
+            }
+            self.hosts[host] = bucket
+        return bucket
+
+    def acquire(self, url):
+        """Block until a request to the URL's host is allowed"""
+        host = urlparse(url).netloc
+        while not stop_requested:
+            with self.lock:
+                bucket = self._get_bucket(host)
+                now = time.monotonic()
+                bucket['tokens'] = min(bucket['burst'], bucket['tokens'] + (now - bucket['updated']) * bucket['rate'])
+                bucket['updated'] = now
+
+                if now < bucket['blocked_until']:
+                    wait = bucket['blocked_until'] - now
+                elif bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1
+                    return
+                else:
+                    wait = (1 - bucket['tokens']) / bucket['rate']
+            # Sleep in short steps so Ctrl+C is noticed quickly
+            time.sleep(min(wait, 1.0))
+
+    def record(self, url, status_code, elapsed, retry_after=None):
+        """
+        Adapt the host's rate to a finished request.
+
+        Args:
+            url: Requested URL
+            status_code: HTTP status, or None if the request raised
+            elapsed: Seconds the request took
+            retry_after: Raw Retry-After header value, if any
+
+        Returns:
+            Seconds the host is paused for (0 if not paused)
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self._get_bucket(host)
+            now = time.monotonic()
+
+            if status_code in (429, 503):
+                bucket['strikes'] += 1
+                bucket['rate'] = self._slowed_rate(bucket, bucket['rate'] / 2)
+                delay = self.parse_retry_after(retry_after)
+                if delay is None:
+                    delay = min(60, 5 * 2 ** (bucket['strikes'] - 1))
+                bucket['blocked_until'] = max(bucket['blocked_until'], now + delay)
+                bucket['tokens'] = 0.0
+                return delay
+
+            if status_code is None:
+                # Connection error - short pause before the host is tried again
+                bucket['rate'] = self._slowed_rate(bucket, bucket['rate'] * 0.7)
+                bucket['blocked_until'] = max(bucket['blocked_until'], now + 3)
+                return 3
+
+            if status_code >= 500:
+                bucket['rate'] = self._slowed_rate(bucket, bucket['rate'] * 0.7)
+            elif elapsed < 1.0:
+                # Additive increase while the host answers quickly
+                bucket['strikes'] = 0
+                bucket['rate'] = min(bucket['max_rate'], bucket['rate'] + 0.25)
+            elif elapsed > 5.0:
+                bucket['rate'] = self._slowed_rate(bucket, bucket['rate'] * 0.8)
+            else:
+                bucket['strikes'] = 0
+            return 0
+
+    def _slowed_rate(self, bucket, rate):
+        """Lowered rate, kept above min_rate but never above the host's cap"""
+        return min(bucket['max_rate'], max(self.min_rate, rate))
+
+    def set_crawl_delay(self, host, delay):
+        """Cap a host's request rate according to its robots.txt Crawl-delay"""
+        if not delay or delay <= 0:
+            return
+        with self.lock:
+            bucket = self._get_bucket(host)
+            # Crawl-delay wins over min_rate, and no burst: one request per delay
+            bucket['max_rate'] = min(bucket['max_rate'], 1.0 / delay)
+            bucket['rate'] = min(bucket['rate'], bucket['max_rate'])
+            bucket['burst'] = 1
+            bucket['tokens'] = min(bucket['tokens'], 1.0)
+
+    @staticmethod
+    def parse_retry_after(value):
+        """Parse a Retry-After header (seconds or HTTP date) into seconds"""
+        if not value:
+            return None
         try:
-            parsed = urlparse(url)
-            if parsed.path and '.' in parsed.path:  # Has a file extension
-                return True
-            if parsed.query:  # Has query parameters (common in assets)
-                return True
-        except:
+            return max(0.0, float(value))
+        except ValueError:
             pass
-            
-        return False
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
 
-    def update_session_headers(self):
-        """Update session headers with random user agent"""
-        headers = {
-            'User-Agent': self.ua.random,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Cache-Control': 'no-cache',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
-        self.session.headers.update(headers)
 
-    def setup_chrome_complete(self):
-        """Setup Chrome for complete asset capture"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--incognito")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--disable-gpu")
-            chrome_options.add_argument("--window-size=1920,1080")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            chrome_options.add_argument(f"--user-agent={self.ua.random}")
-            
-            # Enable performance logging for network requests
-            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-            
-            print("🔄 Starting Chrome for complete asset capture...")
-            self.driver = webdriver.Chrome(options=chrome_options)
-            
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.driver.implicitly_wait(15)
-            print("✅ Chrome started successfully")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Failed to start Chrome: {e}")
-            return False
+class TransferBudget:
+    """
+    Connection and bandwidth budget shared by all sites of a run.
 
-    def manual_cloudflare_solve(self, url):
-        """Manual Cloudflare solving"""
-        print("🚨 CLOUDFLARE SOLVER")
-        print("="*50)
-        
-        if not self.setup_chrome_complete():
-            return False
-            
-        try:
-            print(f"🌐 Opening: {url}")
-            self.driver.get(url)
-            
-            print("\n" + "="*50)
-            print("💡 CHROME IS OPEN!")
-            print("Please:")
-            print("1. Solve any security challenges")
-            print("2. Wait for the page to fully load (CSS, images, everything)")
-            print("3. Scroll down to trigger lazy loading")
-            print("4. Return here and press Enter")
-            print("="*50)
-            
-            input("⏳ Press Enter when the page is COMPLETELY loaded...")
-            
-            current_url = self.driver.current_url
-            print(f"🔗 Current URL: {current_url}")
-            print(f"📄 Page title: {self.driver.title}")
-            
-            # Scroll to trigger lazy loading
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            
-            # Capture ALL cookies
-            cookies = self.driver.get_cookies()
-            for cookie in cookies:
-                self.session.cookies.set(cookie['name'], cookie['value'])
-            
-            print(f"✅ Captured {len(cookies)} cookies")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error during manual solve: {e}")
-            return False
+    With --parallel-sites several downloaders crawl at once; they all hold
+    the same budget so the combined number of open requests and the
+    combined download rate stay within the configured limits. A limit of
+    0 means unlimited.
+    """
 
-    def extract_all_links_complete(self, html, base_url):
-        """Extract ALL links for comprehensive crawling"""
-        soup = BeautifulSoup(html, 'html.parser')
-        links = set()
-        base_domain = urlparse(base_url).netloc
-        
-        # Get all anchor tags
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
-                full_url = urljoin(base_url, href)
-                clean_url = self.clean_url(full_url)
-                
-                if self.is_valid_internal_url(clean_url, base_domain) and self.should_download_url(clean_url):
-                    links.add(clean_url)
-        
-        return links
+    def __init__(self, max_connections=0, max_bytes_per_second=0):
+        """
+        Args:
+            max_connections: Concurrent requests across all sites
+            max_bytes_per_second: Combined download rate across all sites
+        """
+        self.connections = threading.BoundedSemaphore(max_connections) if max_connections > 0 else None
+        self.max_bytes_per_second = max_bytes_per_second
+        self.lock = threading.Lock()
+        self.next_free = time.monotonic()
 
-    def is_valid_internal_url(self, url, base_domain):
-        """Check if URL is valid and internal"""
-        if not url.startswith(('http://', 'https://')):
-            return False
-            
-        if base_domain not in url:
-            return False
-            
-        return True
+    def acquire(self):
+        """Take one of the shared connection slots; prefer connection() where a block fits"""
+        if self.connections is not None:
+            self.connections.acquire()
 
-    def clean_url(self, url):
-        """Clean URL but keep important parameters"""
+    def release(self):
+        if self.connections is not None:
+            self.connections.release()
+
+    @contextmanager
+    def connection(self):
+        """Hold one of the shared connection slots"""
+        self.acquire()
         try:
-            parsed = urlparse(url)
-            # Remove fragment only, keep query parameters
-            cleaned = parsed._replace(fragment='')
-            return cleaned.geturl()
-        except Exception:
-            return url
+            yield
+        finally:
+            self.release()
 
-    def download_with_retry_complete(self, url, retry_count=0, method='get', data=None):
-        """Enhanced download with complete retry logic"""
-        if not self.should_download_url(url):
-            print(f"    🚫 Skipping URL (filtered): {url}")
-            return None
-            
-        if retry_count >= self.max_retries:
-            self.failed_urls.add(url)
-            return None
-        
+    def read_body(self, response, max_bytes=None, chunk_size=64 * 1024):
+        """
+        Read and return a streamed response body, charging the rate limit while it arrives.
+
+        With max_bytes, raises AssetTooLargeError as soon as the declared
+        Content-Length or the bytes received so far exceed it.
+        """
+        body = bytearray()
         try:
-            time.sleep(random.uniform(0.5, 1.5))
-            
-            if random.random() < 0.3:
-                self.update_session_headers()
-            
-            if method == 'post' and data:
-                response = self.session.post(url, data=data, timeout=20, allow_redirects=True)
-            else:
-                response = self.session.get(url, timeout=20, allow_redirects=True)
-            
-            if response.status_code == 200:
-                return response
-            elif response.status_code == 403:
-                print(f"    🚫 403 Forbidden: {url}")
-                return self.try_alternative_download(url, retry_count)
-            elif response.status_code == 429:
-                wait_time = 15 + (retry_count * 10)
-                print(f"    🐢 429 Rate Limited - waiting {wait_time}s: {url}")
-                time.sleep(wait_time)
-                return self.download_with_retry_complete(url, retry_count + 1)
-            elif response.status_code in [404, 410]:
-                print(f"    ❌ {response.status_code} Not Found: {url}")
-                return None
-            else:
-                print(f"    ⚠️ HTTP {response.status_code} for {url}")
-                time.sleep(5)
-                return self.download_with_retry_complete(url, retry_count + 1)
-                
-        except Exception as e:
-            print(f"    ❌ Error: {e}")
-            time.sleep(3)
-            return self.download_with_retry_complete(url, retry_count + 1)
+            declared_size = response.headers.get('content-length', '')
+            if max_bytes and declared_size.isdigit() and int(declared_size) > max_bytes:
+                raise AssetTooLargeError(f"{int(declared_size)//1024}KB")
+            for chunk in response.iter_content(chunk_size):
+                self.consume(len(chunk))
+                body.extend(chunk)
+                if max_bytes and len(body) > max_bytes:
+                    raise AssetTooLargeError(f"over {max_bytes // (1024 * 1024)}MB")
+        finally:
+            response.close()
+        return bytes(body)
 
-    def try_alternative_download(self, url, retry_count):
-        """Try alternative download methods"""
-        print(f"    🔄 Trying alternative download for: {url}")
-        
-        # Method 1: Try with Selenium if available
-        if self.driver:
-            try:
-                js_fetch = f"""
-                fetch('{url}').then(r => r.text()).then(t => window.fetchedContent = t);
-                """
-                self.driver.execute_script(js_fetch)
-                time.sleep(2)
-                content = self.driver.execute_script("return window.fetchedContent || ''")
-                if content:
-                    class MockResponse:
-                        def __init__(self, content):
-                            self.content = content.encode('utf-8')
-                            self.text = content
-                            self.status_code = 200
-                            self.headers = {'content-type': 'text/html'}
-                    return MockResponse(content)
-            except:
-                pass
-        
-        return self.download_with_retry_complete(url, retry_count + 1)
+    def consume(self, byte_count):
+        """Account for received bytes, sleeping to keep the combined rate under the limit"""
+        if self.max_bytes_per_second <= 0 or byte_count <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            # Each transfer reserves its share of the shared pipe; up to one
+            # second of traffic may go through as a burst
+            self.next_free = max(self.next_free, now - 1.0) + byte_count / self.max_bytes_per_second
+            delay = self.next_free - now - 1.0
+        if delay > 0:
+            time.sleep(delay)
 
-    def crawl_website_complete(self, start_url, downloaded_content):
-        """Complete website crawling with enhanced asset capture"""
-        print("🕷️ Starting COMPREHENSIVE website crawl...")
-        
-        self.pages_to_crawl.append(start_url)
-        self.visited_urls.add(start_url)
-        
-        crawled_pages = 0
-        consecutive_failures = 0
-        
-        while self.pages_to_crawl and crawled_pages < self.max_pages and not stop_requested:
-            if consecutive_failures >= 3:
-                print("    🚨 Too many failures, trying recovery...")
-                if not self.recover_from_failures():
+
+class RequestsFetcher:
+    """
+    Blocking HTTP engine on a requests.Session (the default).
+
+    fetch() is the common interface used by download_with_retry_complete and
+    download_asset_complete; AsyncHttpFetcher provides the same one.
+    """
+
+    name = 'requests'
+
+    def __init__(self, session):
+        self.session = session
+
+    def fetch(self, url, method='get', headers=None, data=None, timeout=20, stream=False):
+        if method == 'post' and data:
+            return self.session.post(url, data=data, headers=headers, timeout=timeout, allow_redirects=True,
+                                     stream=stream)
+        return self.session.get(url, headers=headers, timeout=timeout, allow_redirects=True, stream=stream)
+
+    def close(self):
+        pass
+
+
+# Connection-specific headers that must not be sent over HTTP/2
+HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade'}
+
+
+class AsyncHttpResponse:
+    """requests-like view of an httpx response owned by an AsyncHttpFetcher loop"""
+
+    def __init__(self, fetcher, response):
+        self._fetcher = fetcher
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+    @property
+    def encoding(self):
+        return self._response.encoding
+
+    @property
+    def content(self):
+        if not self._response.is_stream_consumed:
+            self._fetcher.run(self._response.aread())
+        return self._response.content
+
+    @property
+    def text(self):
+        if not self._response.is_stream_consumed:
+            self._fetcher.run(self._response.aread())
+        return self._response.text
+
+    def iter_content(self, chunk_size=64 * 1024):
+        """Stream the decoded body, pulling each chunk through the event loop"""
+        if self._response.is_stream_consumed:
+            yield self._response.content
+            return
+        chunks = self._response.aiter_bytes(chunk_size)
+        while True:
+            try:
+                chunk = self._fetcher.run(chunks.__anext__())
+            except StopAsyncIteration:
+                break
+            yield chunk
+
+    def close(self):
+        self._fetcher.run(self._response.aclose())
+
+
+class BufferedResponse:
+    """
+    requests-like view of a response whose decoded body is already in memory.
+
+    Wraps bodies read through TransferBudget.read_body and those Chrome
+    already downloaded (--capture-browser).
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        # The body is already decoded, so the transfer headers no longer describe it
+        self.headers.pop('content-encoding', None)
+        self.headers.pop('content-length', None)
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+    def iter_content(self, chunk_size=64 * 1024):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class AsyncHttpFetcher:
+    """
+    Asyncio HTTP engine: an httpx.AsyncClient on an event loop in its own thread.
+
+    Requests from every crawler and asset worker thread are multiplexed on
+    that one loop, sharing keep-alive connections and HTTP/2 (when h2 is
+    installed and the server supports it). Headers and cookies are taken
+    from the requests session on each call, so the Cloudflare cookies and
+    rotated user agents keep applying.
+    """
+
+    name = 'httpx'
+
+    def __init__(self, session, max_connections=100):
+        self.session = session
+        self.max_connections = max_connections
+        self.http2 = importlib.util.find_spec('h2') is not None
+        self.loop = None
+        self.thread = None
+        self.client = None
+        self.lock = threading.Lock()
+        if not self.http2:
+            print("ℹ️ h2 is not installed - httpx engine will use HTTP/1.1 only")
+
+    def start(self):
+        """Start the event loop thread and client on first use"""
+        with self.lock:
+            if self.loop:
+                return
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever, name='http-engine', daemon=True)
+            self.thread.start()
+            self.client = self.run(self._create_client())
+
+    async def _create_client(self):
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        return httpx.AsyncClient(http2=self.http2, limits=limits, follow_redirects=True)
+
+    def run(self, coroutine):
+        """Run a coroutine on the engine loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def fetch(self, url, method='get', headers=None, data=None, timeout=20, stream=False):
+        if not self.loop:
+            self.start()
+        return self.run(self._fetch(url, method, headers, data, timeout, stream))
+
+    async def _fetch(self, url, method, headers, data, timeout, stream):
+        request_headers = {name: value for name, value in self.session.headers.items()
+                           if name.lower() not in HOP_BY_HOP_HEADERS}
+        if headers:
+            request_headers.update(headers)
+        self.client.cookies.update(self.session.cookies)
+
+        if method == 'post' and data:
+            request = self.client.build_request('POST', url, headers=request_headers, data=data, timeout=timeout)
+        else:
+            request = self.client.build_request('GET', url, headers=request_headers, timeout=timeout)
+        response = await self.client.send(request, stream=stream)
+        return AsyncHttpResponse(self, response)
+
+    def close(self):
+        """Close the client and stop the loop thread"""
+        with self.lock:
+            if not self.loop:
+                return
+            try:
+                self.run(self.client.aclose())
+            finally:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self.thread.join(timeout=5)
+                self.loop.close()
+                self.loop = None
+                self.client = None
+
+
+def create_fetcher(engine, session):
+    """HTTP engine for --http-engine, falling back to requests when httpx is missing"""
+    if engine == 'httpx':
+        if HTTPX_AVAILABLE:
+            return AsyncHttpFetcher(session)
+        print("⚠️ httpx is not installed - falling back to the requests engine")
+    return RequestsFetcher(session)
+
+
+class AssetTooLargeError(Exception):
+    """Raised while streaming an asset body that grows past the size cap"""
+
+
+# .page layout written by PageArchiveWriter:
+# v3 stores raw page/asset bodies as their own members and describes
+# them in manifest.json instead of wrapping them in per-URL JSON files,
+# v4 names those members by content hash (blobs/<sha256>) and may keep
+# them in a shared blob store next to the archives
+PAGE_FORMAT_VERSION = 4
+
+# Response headers kept per URL in the manifest
+STORED_RESPONSE_HEADERS = ('etag', 'last-modified', 'cache-control', 'content-language')
+
+# Formats that are already compressed; deflating them again costs CPU for
+# no gain, and stored members can be read in place (page-browser.py serves
+# stored videos straight from the archive)
+PRECOMPRESSED_EXTENSIONS = (
+    '.mp4', '.m4v', '.webm', '.mkv', '.mov', '.mp3', '.m4a', '.aac', '.ogg', '.opus',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.woff', '.woff2',
+    '.zip', '.gz', '.br', '.xz', '.7z', '.pdf',
+)
+PRECOMPRESSED_CONTENT_TYPES = (
+    'video/', 'audio/', 'image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/avif',
+    'font/woff', 'application/font-woff', 'application/zip', 'application/gzip', 'application/pdf',
+)
+
+
+def member_compression(name, content_type=''):
+    """ZIP compression for an archive member: stored for pre-compressed formats, deflate for the rest"""
+    content_type = (content_type or '').lower()
+    if content_type.startswith(PRECOMPRESSED_CONTENT_TYPES):
+        return zipfile.ZIP_STORED
+    if urlparse(name).path.lower().endswith(PRECOMPRESSED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+# Tag attributes that reference page assets, checked during the single HTML walk
+HTML_ASSET_ATTRIBUTES = {
+    'link': ('href',),
+    'script': ('src',),
+    'img': ('src',),
+    'source': ('src', 'srcset'),
+    'video': ('poster',),
+    'audio': ('src',),
+    'iframe': ('src',),
+    'embed': ('src',),
+    'object': ('data',),
+    'meta': ('content',),
+}
+
+# Attributes on any tag that may hold url(...) references
+HTML_URL_STYLE_ATTRIBUTES = ('style', 'data-src', 'data-background', 'data-url')
+
+def rewrite_page_links(html, base_url):
+    """Page rewritten for the offline browser by the shared page_rewrite code, or None"""
+    try:
+        return page_rewrite.rewrite_links(html, base_url)
+    except Exception as e:
+        print(f"      ⚠️ Could not rewrite links of {base_url}: {e}")
+        return None
+
+
+class PageArchiveWriter:
+    """
+    Incremental writer for website .page files.
+
+    Pages and assets are written to a staging directory as soon as they are
+    fetched and their manifest entries are appended to manifest.jsonl, so
+    nothing but the small per-URL entries is kept in memory. finalize()
+    packs the staging directory into the .page zip, streaming each member
+    from disk, and removes the staging directory.
+
+    Bodies are content addressed (blobs/<sha256>), so the same file reached
+    through several URLs is stored once. With a shared blob store the blobs
+    go to that directory instead of the archive and are reused by every
+    archive written to the same store.
+    """
+
+    def __init__(self, filepath, staging_dir, blob_store=None):
+        self.filepath = filepath
+        self.staging_dir = staging_dir
+        self.blob_store = blob_store
+        self.manifest = {'pages': {}, 'assets': {}}
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.join(staging_dir, 'blobs'), exist_ok=True)
+        if blob_store:
+            os.makedirs(blob_store, exist_ok=True)
+        journal_path = os.path.join(staging_dir, 'manifest.jsonl')
+        needs_newline = self.load_journal(journal_path)
+        self.journal = open(journal_path, 'a', encoding='utf-8')
+        if needs_newline:
+            self.journal.write('\n')
+
+    def load_journal(self, journal_path):
+        """
+        Rebuild the manifest from an existing journal when resuming a crawl.
+
+        Returns True if the journal ends in a partial line (cut off by a crash)
+        that has to be terminated before appending.
+        """
+        if not os.path.exists(journal_path):
+            return False
+
+        last_line = ''
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                last_line = line
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if os.path.exists(self.member_path(record['entry']['member'])):
+                    self.manifest[record['kind']][record['url']] = record['entry']
+        return bool(last_line) and not last_line.endswith('\n')
+
+    def member_path(self, member):
+        """Where a staged member lives on disk"""
+        digest = member[len('blobs/'):]
+        if self.blob_store:
+            return os.path.join(self.blob_store, digest[:2], digest)
+        return os.path.join(self.staging_dir, 'blobs', digest)
+
+    def stage_blob(self, chunks):
+        """
+        Stream chunks into a content-addressed blob without holding the body in memory.
+
+        Returns (member, size). If the chunk iterator raises, the partial
+        temp file is removed and the exception propagates.
+        """
+        temp_dir = self.blob_store or os.path.join(self.staging_dir, 'blobs')
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, suffix='.tmp')
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+
+            member = f"blobs/{digest.hexdigest()}"
+            path = self.member_path(member)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        return member, size
+
+    def _write_blob(self, body):
+        """Store a body under its SHA-256 unless an identical one is already there"""
+        member = f"blobs/{hashlib.sha256(body).hexdigest()}"
+        path = self.member_path(member)
+        if os.path.exists(path):
+            return member
+
+        # Write atomically so a crash never leaves half a body behind
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, path)
+        return member
+
+    def _record(self, kind, url, entry):
+        with self.lock:
+            self.manifest[kind][url] = entry
+            self.journal.write(json.dumps({'kind': kind, 'url': url, 'entry': entry}, ensure_ascii=False) + '\n')
+            self.journal.flush()
+
+    def add_page(self, url, page_data, rewritten=None):
+        """Stage a page and return its manifest entry
+
+        rewritten is an optional copy with links already rewritten for the
+        browser, stored next to the original as 'rewritten_member'.
+        """
+        page_url = page_data.get('url', url)
+        member = self._write_blob(page_data['content'].encode('utf-8'))
+        entry = {k: v for k, v in page_data.items() if k not in ('url', 'content', 'rewritten_member')}
+        entry['member'] = member
+        if rewritten is not None:
+            entry['rewritten_member'] = self._write_blob(rewritten)
+        self._record('pages', page_url, entry)
+        return entry
+
+    def add_asset(self, url, asset_data, body=None, rewritten=None):
+        """
+        Stage an asset's raw bytes and return its manifest entry.
+
+        body is None for assets already streamed in with stage_blob(),
+        whose asset_data carries the 'member' instead. rewritten is an
+        optional browser-ready copy of a stylesheet.
+        """
+        asset_url = asset_data.get('url', url)
+        member = asset_data['member'] if body is None else self._write_blob(body)
+        entry = {k: v for k, v in asset_data.items()
+                 if k not in ('url', 'content', 'encoding', 'rewritten_member')}
+        entry['member'] = member
+        if rewritten is not None:
+            entry['rewritten_member'] = self._write_blob(rewritten)
+        self._record('assets', asset_url, entry)
+        return entry
+
+    def unique_members(self):
+        """Distinct blobs referenced by the manifest, in first-use order"""
+        members = {}
+        for kind in ('pages', 'assets'):
+            for entry in self.manifest[kind].values():
+                members.setdefault(entry['member'], None)
+                if 'rewritten_member' in entry:
+                    members.setdefault(entry['rewritten_member'], None)
+        return list(members)
+
+    def member_compression_types(self):
+        """Compression for each blob, from the content type and URL of the first entry using it"""
+        compress_types = {}
+        for kind in ('pages', 'assets'):
+            for url, entry in self.manifest[kind].items():
+                compress_types.setdefault(entry['member'], member_compression(url, entry.get('content_type')))
+                if 'rewritten_member' in entry:
+                    compress_types.setdefault(entry['rewritten_member'], zipfile.ZIP_DEFLATED)
+        return compress_types
+
+    def get_blob_store_reference(self):
+        """Blob store location as recorded in the archive, relative to the .page file when possible"""
+        try:
+            return os.path.relpath(self.blob_store, os.path.dirname(os.path.abspath(self.filepath)))
+        except ValueError:
+            # Different drive on Windows
+            return os.path.abspath(self.blob_store)
+
+    def finalize(self, metadata):
+        """Pack the staged members into the .page file and remove the staging directory"""
+        self.journal.close()
+        manifest = {'format': PAGE_FORMAT_VERSION}
+        if self.blob_store:
+            metadata = dict(metadata, blob_store=self.get_blob_store_reference())
+            manifest['blob_store'] = metadata['blob_store']
+        manifest.update(self.manifest)
+
+        temp_path = self.filepath + '.tmp'
+        try:
+            with zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                metadata_json = json.dumps(metadata, indent=2, ensure_ascii=False)
+                zipf.writestr('metadata.json', metadata_json.encode('utf-8'))
+
+                # Blobs in a shared store stay outside the archive
+                if not self.blob_store:
+                    for member, compress_type in self.member_compression_types().items():
+                        zipf.write(self.member_path(member), member, compress_type=compress_type)
+
+                manifest_json = json.dumps(manifest, separators=(',', ':'), ensure_ascii=False)
+                zipf.writestr('manifest.json', manifest_json.encode('utf-8'))
+
+            os.replace(temp_path, self.filepath)
+        except BaseException:
+            # Never leave a half-written archive next to the real ones
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        self.discard()
+        return self.filepath
+
+    def discard(self):
+        """Throw away everything staged so far"""
+        if not self.journal.closed:
+            self.journal.close()
+        shutil.rmtree(self.staging_dir, ignore_errors=True)
+        try:
+            # Remove the shared .staging folder once nothing else is in it
+            os.rmdir(os.path.dirname(self.staging_dir))
+        except OSError:
+            pass
+
+
+class PreviousPageArchive:
+    """
+    Read-only view of an earlier .page file of the same site.
+
+    Used by incremental updates: the stored ETag/Last-Modified headers of
+    each URL become conditional request headers, and when the server answers
+    304 Not Modified the body is copied from this archive instead of being
+    downloaded again. Only format v3 and v4 archives store response headers;
+    v4 member names may point into a shared blob store.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.zipf = zipfile.ZipFile(filepath, 'r')
+        self.lock = threading.Lock()
+        try:
+            manifest = json.loads(self.zipf.read('manifest.json').decode('utf-8'))
+        except KeyError:
+            self.zipf.close()
+            raise ValueError('archive has no manifest.json (format v2 or older)')
+        self.pages = manifest.get('pages', {})
+        self.assets = manifest.get('assets', {})
+        self.blob_store = None
+        if manifest.get('blob_store'):
+            self.blob_store = os.path.join(os.path.dirname(os.path.abspath(filepath)), manifest['blob_store'])
+
+    def get_conditional_headers(self, kind, url):
+        """If-None-Match / If-Modified-Since headers for a URL stored in this archive"""
+        entry = getattr(self, kind).get(url)
+        if not entry:
+            return {}
+        stored = entry.get('headers', {})
+        headers = {}
+        if 'etag' in stored:
+            headers['If-None-Match'] = stored['etag']
+        if 'last-modified' in stored:
+            headers['If-Modified-Since'] = stored['last-modified']
+        return headers
+
+    def read_member(self, entry):
+        member = entry['member']
+        if self.blob_store and member.startswith('blobs/'):
+            digest = member[len('blobs/'):]
+            with open(os.path.join(self.blob_store, digest[:2], digest), 'rb') as f:
+                return f.read()
+        with self.lock:
+            return self.zipf.read(member)
+
+    def get_page(self, url):
+        """Rebuild page data for an unchanged page"""
+        entry = self.pages[url]
+        # The rewritten copy is re-derived (or dropped) when the entry is stored again
+        page_data = {k: v for k, v in entry.items() if k not in ('member', 'rewritten_member')}
+        page_data['url'] = url
+        page_data['content'] = self.read_member(entry).decode('utf-8', errors='replace')
+        page_data['headers'] = dict(entry.get('headers', {}))
+        return page_data
+
+    def get_asset(self, url):
+        """Rebuild asset data for an unchanged asset"""
+        entry = self.assets[url]
+        asset_data = {k: v for k, v in entry.items() if k not in ('member', 'rewritten_member')}
+        asset_data['url'] = url
+        asset_data['content'] = self.read_member(entry)
+        asset_data['encoding'] = 'binary'
+        asset_data['headers'] = dict(entry.get('headers', {}))
+        return asset_data
+
+    def close(self):
+        self.zipf.close()
+
+
+# Text found only in the interstitial pages of Cloudflare and similar bot checks
+CHALLENGE_MARKERS = (
+    'cf-chl', 'cf_chl_opt', '/cdn-cgi/challenge-platform', 'challenge-form',
+    'Just a moment...', 'Checking your browser', 'Attention Required! | Cloudflare',
+    'DDoS protection by',
+)
+
+# CAPTCHA widgets also sit on ordinary login and contact pages, so they only
+# count as a challenge on a 403/503 answer
+CAPTCHA_MARKERS = ('g-recaptcha', 'h-captcha')
+
+
+def looks_like_challenge(status_code, body):
+    """True for a 403/503 response that is a bot challenge rather than a real error"""
+    if status_code not in (403, 503):
+        return False
+    return any(marker in body for marker in CHALLENGE_MARKERS + CAPTCHA_MARKERS)
+
+
+class ChromeDriverPool:
+    """
+    Pool of warm, reusable Chrome instances.
+
+    Starting Chrome takes seconds and hundreds of MB, so drivers are kept
+    running between sites instead of being quit after each one. acquire()
+    hands out a driver that passed a health check; release() wipes cookies,
+    storage, cache and the performance log before the driver is reused by
+    the next site. Drivers are recycled after max_uses sites.
+    """
+
+    def __init__(self, size=1, max_uses=20, headless=False):
+        """
+        Args:
+            size: Maximum number of Chrome instances running at once
+            max_uses: Sites served by one instance before it is restarted
+            headless: Run Chrome without a window (unattended mode)
+        """
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.headless = headless
+        self.idle = []
+        self.uses = {}
+        self.running = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        self.ua = UserAgent()
+
+    def create_driver(self):
+        """Start a new Chrome configured for complete asset capture"""
+        chrome_options = Options()
+        chrome_options.add_argument("--incognito")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--window-size=1920,1080")
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        chrome_options.add_argument(f"--user-agent={self.ua.random}")
+        if self.headless:
+            chrome_options.add_argument("--headless=new")
+        
+        # Enable performance logging for network requests
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
+        print("🔄 Starting Chrome for complete asset capture...")
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.implicitly_wait(15)
+        print("✅ Chrome started successfully")
+        return driver
+
+    def prewarm(self):
+        """Start the pool's Chrome instances in the background so the first sites don't wait"""
+        def start_one():
+            driver = self._start_slot()
+            if driver:
+                self.release(driver, reset=False)
+
+        with self.condition:
+            missing = self.size - self.running
+        for _ in range(missing):
+            threading.Thread(target=start_one, name='chrome-prewarm', daemon=True).start()
+
+    def _start_slot(self):
+        """Reserve a free slot and start a driver in it; None if the pool is full or Chrome fails"""
+        with self.condition:
+            if self.running >= self.size:
+                return None
+            self.running += 1
+        try:
+            driver = self.create_driver()
+        except Exception as e:
+            print(f"❌ Failed to start Chrome: {e}")
+            with self.condition:
+                self.running -= 1
+                self.condition.notify()
+            return None
+        self.uses[id(driver)] = 0
+        return driver
+
+    def acquire(self, timeout=None):
+        """Get a healthy driver, waiting for one to be released if the pool is full"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.condition:
+                while not self.idle and self.running >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return None
+                    self.condition.wait(remaining)
+                driver = self.idle.pop() if self.idle else None
+
+            if driver is None:
+                driver = self._start_slot()
+                if driver is None:
+                    return None
+            elif not self.is_healthy(driver):
+                print("    🩺 Pooled Chrome is unresponsive - replacing it")
+                self.discard(driver)
+                continue
+
+            self.uses[id(driver)] = self.uses.get(id(driver), 0) + 1
+            return driver
+
+    def release(self, driver, reset=True):
+        """Give a driver back to the pool, with cookies and storage wiped for the next site"""
+        if driver is None:
+            return
+        if self.closed or self.uses.get(id(driver), 0) >= self.max_uses:
+            self.discard(driver)
+            return
+        if reset:
+            try:
+                self.reset(driver)
+            except Exception as e:
+                print(f"    ⚠️ Could not reset pooled Chrome: {e}")
+                self.discard(driver)
+                return
+        with self.condition:
+            self.idle.append(driver)
+            self.condition.notify()
+
+    def discard(self, driver):
+        """Quit a driver and free its slot"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self.uses.pop(id(driver), None)
+        with self.condition:
+            self.running -= 1
+            self.condition.notify()
+
+    def is_healthy(self, driver):
+        try:
+            return driver.execute_script("return 1") == 1 and bool(driver.window_handles)
+        except Exception:
+            return False
+
+    def reset(self, driver):
+        """Isolate the next site: one tab, no cookies, storage, cache or old network log"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except Exception:
+            pass
+        driver.delete_all_cookies()
+        driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+        driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        driver.get('about:blank')
+        driver.get_log('performance')
+
+    def close(self):
+        """Quit every idle driver; drivers still in use are quit when released"""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for driver in idle:
+            self.discard(driver)
+
+
+class NetworkLogReader:
+    """
+    Incremental consumer of Chrome's performance log.
+
+    The log is drained in small batches while a page loads instead of in
+    one go afterwards, so chromedriver's buffer never grows large. Only
+    Network.responseReceived entries are JSON decoded (the raw string is
+    checked first) and each URL is kept once, with at most max_responses
+    URLs held until they are taken.
+    """
+
+    RESPONSE_METHOD = '"Network.responseReceived"'
+
+    def __init__(self, max_responses=5000):
+        self.max_responses = max_responses
+        self.responses = {}
+
+    def drain(self, driver):
+        """Read the entries logged since the last drain"""
+        for entry in driver.get_log('performance'):
+            raw = entry.get('message', '')
+            if self.RESPONSE_METHOD not in raw:
+                continue
+            try:
+                message = json.loads(raw)['message']
+                if message.get('method') != 'Network.responseReceived':
+                    continue
+                params = message['params']
+                response = params['response']
+            except (ValueError, KeyError, TypeError):
+                continue
+
+            url = response.get('url', '')
+            known = self.responses.get(url)
+            # First successful response per URL wins
+            if not url or (known and known['status'] == 200):
+                continue
+            if not known and len(self.responses) >= self.max_responses:
+                # Drop the oldest URL to stay bounded
+                del self.responses[next(iter(self.responses))]
+            self.responses[url] = {
+                'request_id': params.get('requestId'),
+                'status': response.get('status'),
+                'headers': response.get('headers', {})
+            }
+
+    def take(self):
+        """Return the responses collected so far and start over"""
+        responses, self.responses = self.responses, {}
+        return responses
+
+    def clear(self):
+        self.responses = {}
+
+
+class UrlClassifier:
+    """
+    Decides which candidate URLs the crawler downloads.
+
+    The RELAXED filter rules are compiled once into combined regexes and
+    every decision is cached per URL, since the same URLs turn up again and
+    again in the HTML, CSS, JS and Selenium logs of a site.
+    """
+
+    # Obvious junk that ends up in src/href attributes - MUCH MORE PERMISSIVE
+    JUNK_PATTERNS = (
+        r'[a-f0-9]{64}',  # SHA256 hashes
+        r'[a-f0-9]{40}',  # SHA1 hashes
+        r'[a-zA-Z0-9+/]{40,}={0,2}',  # Long base64 strings
+        r'[\w\s-]+\s+[\w\s-]+',  # Plain text with spaces (like "width=device-width")
+        r':[\w]+\(.*\)',  # Rails-style routes like ":solution(.:format)"
+        r'@\w+',  # Twitter handles
+    )
+
+    # Paths that look like web resources
+    ASSET_PATTERNS = (
+        r'\.(css|js|png|jpg|jpeg|gif|svg|ico|woff|ttf|webp)(\?.*)?$',
+        r'/static/',
+        r'/assets/',
+        r'/images/',
+        r'/fonts/',
+        r'/css/',
+        r'/js/',
+        r'\.min\.(js|css)',
+    )
+
+    def __init__(self, asset_extensions, cache_size=65536):
+        """
+        Args:
+            asset_extensions: File extensions that always count as assets
+            cache_size: Number of decisions kept per check
+        """
+        self.asset_extensions = tuple(ext.lower() for ext in asset_extensions)
+        self.junk_regex = re.compile('^(?:' + '|'.join(self.JUNK_PATTERNS) + ')$')
+        self.asset_regex = re.compile('|'.join(f'(?:{p})' for p in self.ASSET_PATTERNS), re.IGNORECASE)
+        self._is_valid = lru_cache(maxsize=cache_size)(self._check_valid)
+        self._is_likely_asset = lru_cache(maxsize=cache_size)(self._check_likely_asset)
+
+    def is_valid(self, url):
+        """RELAXED URL validation - only filter obvious junk"""
+        if not url or not isinstance(url, str):
+            return False
+        return self._is_valid(url)
+
+    def _check_valid(self, url):
+        if self.junk_regex.match(url.strip()):
+            return False
+
+        # Must have a valid scheme and netloc for HTTP URLs
+        try:
+            parsed = urlparse(url)
+        except Exception:
+            return False
+
+        # Skip data URLs and javascript
+        if parsed.scheme in ('data', 'javascript', 'mailto', 'tel'):
+            return False
+
+        # For HTTP URLs, require netloc
+        if parsed.scheme in ('http', 'https') and not parsed.netloc:
+            return False
+
+        return True
+
+    def is_likely_asset(self, url):
+        """Check if URL is likely a downloadable asset - MORE PERMISSIVE"""
+        return self._is_likely_asset(url)
+
+    def _check_likely_asset(self, url):
+        if url.lower().endswith(self.asset_extensions):
+            return True
+        if self.asset_regex.search(url):
+            return True
+        # For CSS Zen Garden specifically, be more permissive
+        return 'csszengarden.com' in url
+
+    def should_download(self, url):
+        """
+        Main decision function for whether to download a URL.
+
+        Every valid URL passes: the page check has always accepted URLs ending
+        in '' (i.e. all of them), which is what makes the filter RELAXED.
+        """
+        return self.is_valid(url)
+
+    def filter_downloadable(self, urls):
+        """Classify a batch of candidate URLs and return the set worth downloading"""
+        return {url for url in set(urls) if self.should_download(url)}
+
+    def cache_info(self):
+        return {'valid': self._is_valid.cache_info(), 'likely_asset': self._is_likely_asset.cache_info()}
+
+
+class CompleteWebsiteDownloader:
+    def __init__(self, output_dir=None, max_pages=10, skip_assets=False,
+                 asset_workers=8, per_host_connections=4, rate_limiter=None, resume=False,
+                 update=False, blob_store=None, html_parser='html.parser', processes=1,
+                 http_engine='requests', budget=None, parallel_sites=1, driver_pool=None,
+                 unattended=False, ready_selector=None, challenge_timeout=30, capture_browser=False,
+                 store_rewritten=False):
+        # Settings for the per-site copies made by download_from_list
+        self.site_options = {
+            'output_dir': output_dir, 'max_pages': max_pages, 'skip_assets': skip_assets,
+            'asset_workers': asset_workers, 'per_host_connections': per_host_connections,
+            'resume': resume, 'update': update, 'blob_store': blob_store,
+            'html_parser': html_parser, 'processes': processes, 'http_engine': http_engine,
+            'unattended': unattended, 'ready_selector': ready_selector,
+            'challenge_timeout': challenge_timeout, 'capture_browser': capture_browser,
+            'store_rewritten': store_rewritten
+        }
+
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        if output_dir is None:
+            self.output_dir = os.path.join(script_dir, "downloaded_sites")
+        else:
+            self.output_dir = os.path.abspath(output_dir)
+            
+        print(f"📁 Save location: {self.output_dir}")
+        
+        self.max_pages = max_pages
+        self.skip_assets = skip_assets
+        
+        # Initialize YouTube downloader with enhanced suggestions
+        youtube_output_dir = os.path.join(self.output_dir, "youtube_videos")
+        self.youtube_downloader = YouTubeDownloader(
+            output_dir=youtube_output_dir,
+            max_pages=self.max_pages
+        )
+        
+        # Initialize session with better headers
+        self.pinned_user_agent = None
+        self.session = requests.Session()
+        self.ua = UserAgent()
+        self.update_session_headers()
+        
+        # Chrome instances are borrowed from a pool and kept warm between sites
+        self.driver = None
+        self.driver_pool = driver_pool
+        self.owns_driver_pool = driver_pool is None
+
+        # Unattended mode: no prompts, a headless browser only for challenged sites
+        self.unattended = unattended
+        self.ready_selector = ready_selector
+        self.challenge_timeout = challenge_timeout
+
+        # Take asset bodies Chrome already loaded from the DevTools protocol
+        self.capture_browser = capture_browser
+        self.browser_captured = 0
+        self.network_log = NetworkLogReader()
+        self.visited_urls = set()
+        self.pages_to_crawl = deque()
+        self.failed_urls = set()
+        self.max_retries = 3
+
+        # Per-host politeness scheduler used instead of fixed sleeps
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+
+        # Concurrent asset downloads: global worker count and per-host connection cap
+        self.asset_workers = asset_workers
+        self.per_host_connections = per_host_connections
+        self.host_slots = {}
+        self.state_lock = threading.Lock()
+        # The WebDriver client is not thread-safe; asset workers take turns with it
+        self.driver_lock = threading.Lock()
+
+        # Incremental .page writer for the crawl in progress
+        self.archive_writer = None
+        self.resume = resume
+
+        # Previous archive of the site used for conditional requests (--update)
+        self.update = update
+        self.previous_archive = None
+        self.reused_responses = 0
+
+        # Optional content-addressed blob store shared by all archives
+        self.blob_store = os.path.abspath(blob_store) if blob_store else None
+
+        # Also store browser-ready copies of pages and stylesheets
+        self.store_rewritten = store_rewritten
+        
+        # Asset type priorities
+        self.critical_assets = ['.css', '.js']
+        self.important_assets = ['.png', '.jpg', '.jpeg', '.svg', '.ico', '.woff', '.woff2', '.ttf']
+        self.other_assets = ['.gif', '.webp', '.mp4', '.webm', '.json', '.xml']
+
+        # Compiled, cached URL filter shared by every extraction step
+        self.url_classifier = UrlClassifier(self.critical_assets + self.important_assets + self.other_assets)
+
+        # Larger asset bodies are skipped (checked before and while streaming)
+        self.max_asset_size = 10 * 1024 * 1024
+
+        # BeautifulSoup backend used for the one parse of every crawled page
+        if html_parser == 'lxml' and not LXML_AVAILABLE:
+            print("⚠️ lxml is not installed - falling back to html.parser")
+            html_parser = 'html.parser'
+        self.html_parser = html_parser
+
+        # Worker processes that fetch and parse pages (--processes)
+        self.processes = max(1, processes)
+
+        # HTTP engine behind download_with_retry_complete/download_asset_complete
+        self.fetcher = create_fetcher(http_engine, self.session)
+
+        # Connection/bandwidth budget shared with the other sites of the run
+        self.budget = budget or TransferBudget()
+        self.parallel_sites = max(1, parallel_sites)
+        
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir, exist_ok=True)
+            print(f"✅ Created directory: {self.output_dir}")
+
+    def is_valid_url(self, url):
+        """RELAXED URL validation - only filter obvious junk"""
+        return self.url_classifier.is_valid(url)
+
+    def is_likely_asset_url(self, url):
+        """Check if URL is likely a downloadable asset - MORE PERMISSIVE"""
+        return self.url_classifier.is_likely_asset(url)
+
+    def should_download_url(self, url):
+        """Main decision function for whether to download a URL"""
+        return self.url_classifier.should_download(url)
+
+    def update_session_headers(self):
+        """Update session headers with random user agent"""
+        headers = {
+            'User-Agent': self.pinned_user_agent or self.ua.random,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+            'Accept-Language': 'en-US,en;q=0.9',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Cache-Control': 'no-cache',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+        }
+        self.session.headers.update(headers)
+
+    def setup_chrome_complete(self):
+        """Borrow a Chrome for complete asset capture from the driver pool"""
+        if self.driver:
+            return True
+        if self.driver_pool is None:
+            self.driver_pool = ChromeDriverPool(headless=self.unattended)
+
+        driver = self.driver_pool.acquire()
+        if not driver:
+            return False
+        try:
+            # A fresh user agent per site, as when every site started its own Chrome
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': self.ua.random})
+        except Exception:
+            pass
+        self.driver = driver
+        return True
+
+    def release_driver(self):
+        """Hand this site's Chrome back to the pool"""
+        if self.driver:
+            self.driver_pool.release(self.driver)
+            self.driver = None
+        self.network_log.clear()
+
+    def wait_for_browser(self, seconds):
+        """Let the page load for a while, draining the performance log as it fills"""
+        deadline = time.monotonic() + seconds
+        while not stop_requested:
+            self.drain_network_log()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(0.5, remaining))
+
+    def drain_network_log(self):
+        try:
+            self.network_log.drain(self.driver)
+        except Exception as e:
+            print(f"      ⚠️ Selenium network log error: {e}")
+
+    def manual_cloudflare_solve(self, url):
+        """Manual Cloudflare solving"""
+        print("🚨 CLOUDFLARE SOLVER")
+        print("="*50)
+        
+        if not self.setup_chrome_complete():
+            return False
+            
+        try:
+            print(f"🌐 Opening: {url}")
+            self.driver.get(url)
+            
+            print("\n" + "="*50)
+            print("💡 CHROME IS OPEN!")
+            print("Please:")
+            print("1. Solve any security challenges")
+            print("2. Wait for the page to fully load (CSS, images, everything)")
+            print("3. Scroll down to trigger lazy loading")
+            print("4. Return here and press Enter")
+            print("="*50)
+            
+            with console_input_lock:
+                input("⏳ Press Enter when the page is COMPLETELY loaded...")
+            
+            current_url = self.driver.current_url
+            print(f"🔗 Current URL: {current_url}")
+            print(f"📄 Page title: {self.driver.title}")
+            
+            # Scroll to trigger lazy loading
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            self.wait_for_browser(2)
+            self.driver.execute_script("window.scrollTo(0, 0);")
+            
+            self.adopt_browser_session()
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error during manual solve: {e}")
+            return False
+
+    def adopt_browser_session(self):
+        """Copy the browser's cookies and user agent to the requests session"""
+        # Capture ALL cookies
+        cookies = self.driver.get_cookies()
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+
+        # Challenge cookies (cf_clearance) are tied to the user agent that earned them
+        self.pinned_user_agent = self.driver.execute_script("return navigator.userAgent")
+        self.session.headers['User-Agent'] = self.pinned_user_agent
+        print(f"✅ Captured {len(cookies)} cookies")
+
+    def prepare_session_unattended(self, url):
+        """
+        Get a working session without prompts.
+
+        Probes the site with the plain session first; only when it answers
+        with a bot challenge is a headless browser used to pass it, after
+        which its cookies and user agent are handed to the session.
+        """
+        print("🤖 Unattended mode - probing without a browser")
+        self.rate_limiter.acquire(url)
+        start_time = time.monotonic()
+        try:
+            response = self.fetch_buffered(url, timeout=20)
+            status_code, body = response.status_code, response.text
+        except Exception as e:
+            print(f"    ⚠️ Probe failed: {e}")
+            self.rate_limiter.record(url, None, 0)
+            return True
+        self.rate_limiter.record(url, status_code, time.monotonic() - start_time,
+                                 response.headers.get('retry-after'))
+
+        if not looks_like_challenge(status_code, body):
+            print(f"    ✅ No challenge (HTTP {status_code}) - crawling without a browser")
+            return True
+
+        print(f"    🚨 Challenge detected (HTTP {status_code}) - solving in headless Chrome")
+        return self.solve_challenge_headless(url)
+
+    def solve_challenge_headless(self, url):
+        """Open the page in a pooled Chrome and wait until the challenge is gone and the page is ready"""
+        if not self.setup_chrome_complete():
+            return False
+
+        try:
+            self.driver.get(url)
+            deadline = time.monotonic() + self.challenge_timeout
+            while not stop_requested:
+                self.drain_network_log()
+                if self.is_browser_page_ready():
+                    self.adopt_browser_session()
+                    print(f"    ✅ Challenge passed: {self.driver.title}")
+                    return True
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(1)
+        except Exception as e:
+            print(f"❌ Error during headless solve: {e}")
+            return False
+
+        print(f"    ❌ Page not ready after {self.challenge_timeout}s")
+        return False
+
+    def is_browser_page_ready(self):
+        """Readiness condition: loaded, no challenge markers and (optionally) --ready-selector present"""
+        ready_state = self.driver.execute_script("return document.readyState")
+        if ready_state != 'complete':
+            return False
+        page_source = self.driver.page_source
+        if any(marker in page_source for marker in CHALLENGE_MARKERS):
+            return False
+        if self.ready_selector:
+            # querySelector instead of find_elements, which would sit out the implicit wait
+            return self.driver.execute_script(
+                "return document.querySelector(arguments[0]) !== null", self.ready_selector)
+        return True
+
+    def parse_page_html(self, html, base_url):
+        """
+        Parse a page once and collect everything the crawler needs from it.
+
+        Returns a dict with the internal 'links' to crawl, the 'assets' to
+        download (including URLs found in inline CSS/JS) and the 'inline_css'
+        and 'inline_js' blocks, all gathered in a single walk over the tree.
+        """
+        soup = BeautifulSoup(html, self.html_parser)
+        base_domain = urlparse(base_url).netloc
+        links = set()
+        candidates = set()
+        inline_css = []
+        inline_js = []
+
+        def add_asset(value):
+            candidates.add(urljoin(base_url, value))
+
+        for tag in soup.find_all(True):
+            name = tag.name
+
+            if name == 'a':
+                href = tag.get('href')
+                if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+                    clean_url = self.clean_url(urljoin(base_url, href))
+                    if self.is_valid_internal_url(clean_url, base_domain):
+                        links.add(clean_url)
+
+            for attr in HTML_ASSET_ATTRIBUTES.get(name, ()):
+                attr_value = tag.get(attr)
+                if not attr_value:
+                    continue
+                if attr == 'srcset':
+                    # Handle srcset (multiple images)
+                    for src_entry in attr_value.split(','):
+                        src_url = src_entry.strip().split(' ')[0]
+                        if src_url:
+                            add_asset(src_url)
+                else:
+                    add_asset(attr_value)
+
+            if name == 'style' and tag.string:
+                inline_css.append(tag.string)
+            elif name == 'script' and tag.string:
+                inline_js.append(tag.string)
+
+            for attr in HTML_URL_STYLE_ATTRIBUTES:
+                attr_value = tag.get(attr)
+                if attr_value:
+                    for url in re.findall(r'url\([\'"]?([^)"\']+)[\'"]?\)', attr_value):
+                        add_asset(url)
+
+        assets = self.url_classifier.filter_downloadable(candidates)
+        for css_text in inline_css:
+            assets.update(self.extract_urls_from_css(css_text, base_url))
+        for js_text in inline_js:
+            assets.update(self.extract_urls_from_js(js_text, base_url))
+
+        return {
+            'links': self.url_classifier.filter_downloadable(links),
+            'assets': assets,
+            'inline_css': inline_css,
+            'inline_js': inline_js
+        }
+
+    def is_valid_internal_url(self, url, base_domain):
+        """Check if URL is valid and internal"""
+        if not url.startswith(('http://', 'https://')):
+            return False
+            
+        if base_domain not in url:
+            return False
+            
+        return True
+
+    def clean_url(self, url):
+        """Clean URL but keep important parameters"""
+        try:
+            parsed = urlparse(url)
+            # Remove fragment only, keep query parameters
+            cleaned = parsed._replace(fragment='')
+            return cleaned.geturl()
+        except Exception:
+            return url
+
+    def fetch_buffered(self, url, max_bytes=None, **kwargs):
+        """Fetch a whole response in a shared connection slot, pacing its body against the bandwidth cap"""
+        with self.budget.connection():
+            response = self.fetcher.fetch(url, stream=True, **kwargs)
+            body = self.budget.read_body(response, max_bytes)
+        return BufferedResponse(response.url, response.status_code, response.headers, body,
+                                response.encoding)
+
+    def download_with_retry_complete(self, url, retry_count=0, method='get', data=None, headers=None,
+                                     max_bytes=None):
+        """
+        Enhanced download with complete retry logic.
+
+        Extra request headers (e.g. If-None-Match) are sent on every attempt;
+        a 304 Not Modified answer is returned like a successful response.
+        A body over max_bytes raises AssetTooLargeError without a retry.
+        """
+        if not self.should_download_url(url):
+            print(f"    🚫 Skipping URL (filtered): {url}")
+            return None
+            
+        if retry_count >= self.max_retries:
+            self.failed_urls.add(url)
+            return None
+        
+        try:
+            self.rate_limiter.acquire(url)
+            
+            if random.random() < 0.3:
+                self.update_session_headers()
+            
+            start_time = time.monotonic()
+            response = self.fetch_buffered(url, max_bytes, method=method, headers=headers, data=data,
+                                           timeout=20)
+            pause = self.rate_limiter.record(url, response.status_code, time.monotonic() - start_time,
+                                             response.headers.get('retry-after'))
+            
+            if response.status_code in (200, 304):
+                return response
+            elif response.status_code == 403:
+                print(f"    🚫 403 Forbidden: {url}")
+                return self.try_alternative_download(url, retry_count)
+            elif response.status_code == 429:
+                print(f"    🐢 429 Rate Limited - pausing host for {pause:.0f}s: {url}")
+                return self.download_with_retry_complete(url, retry_count + 1, method, data, headers, max_bytes)
+            elif response.status_code in [404, 410]:
+                print(f"    ❌ {response.status_code} Not Found: {url}")
+                return None
+            else:
+                print(f"    ⚠️ HTTP {response.status_code} for {url}")
+                return self.download_with_retry_complete(url, retry_count + 1, method, data, headers, max_bytes)
+                
+        except AssetTooLargeError:
+            raise
+        except Exception as e:
+            print(f"    ❌ Error: {e}")
+            self.rate_limiter.record(url, None, 0)
+            return self.download_with_retry_complete(url, retry_count + 1, method, data, headers, max_bytes)
+
+    def try_alternative_download(self, url, retry_count):
+        """Try alternative download methods"""
+        print(f"    🔄 Trying alternative download for: {url}")
+        
+        # Method 1: Try with Selenium if available
+        if self.driver:
+            try:
+                js_fetch = f"""
+                window.fetchedContent = '';
+                fetch('{url}').then(r => r.text()).then(t => window.fetchedContent = t);
+                """
+                # window.fetchedContent is shared, so only one fetch may be in flight
+                with self.driver_lock:
+                    self.driver.execute_script(js_fetch)
+                    time.sleep(2)
+                    content = self.driver.execute_script("return window.fetchedContent || ''")
+                if content:
+                    class MockResponse:
+                        def __init__(self, content):
+                            self.content = content.encode('utf-8')
+                            self.text = content
+                            self.status_code = 200
+                            self.headers = {'content-type': 'text/html'}
+                    return MockResponse(content)
+            except:
+                pass
+        
+        return self.download_with_retry_complete(url, retry_count + 1)
+
+    def crawl_website_complete(self, start_url, downloaded_content, resumed_pages=None):
+        """Complete website crawling with enhanced asset capture"""
+        print("🕷️ Starting COMPREHENSIVE website crawl...")
+        self.load_crawl_delay(start_url)
+        
+        if resumed_pages is None:
+            self.pages_to_crawl.append(start_url)
+            self.visited_urls.add(start_url)
+            crawled_pages = 0
+        else:
+            # Frontier and visited/failed sets were restored from a checkpoint
+            crawled_pages = resumed_pages
+
+        if self.processes > 1:
+            crawled_pages = self.crawl_pages_in_processes(start_url, downloaded_content, crawled_pages)
+        else:
+            crawled_pages = self.crawl_pages_serially(start_url, downloaded_content, crawled_pages)
+
+        self.save_checkpoint(start_url, downloaded_content, crawled_pages)
+        print(f"✅ Crawl complete: {crawled_pages} pages")
+        
+        # Final asset discovery pass
+        if not self.skip_assets and not stop_requested:
+            self.final_asset_discovery(downloaded_content)
+
+    def crawl_pages_serially(self, start_url, downloaded_content, crawled_pages):
+        """Crawl loop: fetch, parse and download assets one page at a time"""
+        consecutive_failures = 0
+        last_checkpoint = time.time()
+        last_checkpointed_count = crawled_pages
+        
+        while self.pages_to_crawl and crawled_pages < self.max_pages and not stop_requested:
+            if consecutive_failures >= 3:
+                print("    🚨 Too many failures, trying recovery...")
+                if not self.recover_from_failures():
                     break
                 consecutive_failures = 0
                 
@@ -1316,32 +2607,290 @@ class CompleteWebsiteDownloader:
             # Download the page with multiple approaches
             page_data = self.download_page_enhanced(current_url)
             if page_data:
-                downloaded_content['pages'][current_url] = page_data
                 crawled_pages += 1
                 consecutive_failures = 0
                 
-                # Extract links for further crawling
-                new_links = self.extract_all_links_complete(page_data['content'], current_url)
-                for link in new_links:
-                    if link not in self.visited_urls and link not in self.failed_urls and not stop_requested:
-                        self.visited_urls.add(link)
-                        self.pages_to_crawl.append(link)
-                        print(f"      🔗 Found new page: {self.get_url_display_name(link)}")
-                
-                # Download ALL assets including CSS from this page
-                if not self.skip_assets and not stop_requested:
-                    self.download_all_assets_enhanced(page_data['content'], current_url, downloaded_content)
-                
-                time.sleep(random.uniform(1, 2))
+                # Parse once for both links and assets
+                parsed = self.parse_page_html(page_data['content'], current_url)
+                self.record_crawled_page(current_url, page_data, parsed, downloaded_content)
+
+                if stop_requested:
+                    # Assets may be incomplete - crawl this page again on resume
+                    self.pages_to_crawl.appendleft(current_url)
+                    crawled_pages -= 1
             else:
                 consecutive_failures += 1
                 print(f"    ❌ Failed (#{consecutive_failures})")
+
+            if self.checkpoint_due(crawled_pages, last_checkpointed_count, last_checkpoint):
+                self.save_checkpoint(start_url, downloaded_content, crawled_pages)
+                last_checkpoint = time.time()
+                last_checkpointed_count = crawled_pages
+
+        return crawled_pages
+
+    def checkpoint_due(self, crawled_pages, last_checkpointed_count, last_checkpoint):
+        """Checkpoint after every 10 newly crawled pages or 60 seconds, whichever comes first"""
+        return crawled_pages - last_checkpointed_count >= 10 or time.time() - last_checkpoint >= 60
+
+    def record_crawled_page(self, current_url, page_data, parsed, downloaded_content):
+        """Store a fetched page, queue its new links and download its assets"""
+        self.store_page(current_url, page_data, downloaded_content)
+
+        # Extract links for further crawling
+        for link in parsed['links']:
+            if link not in self.visited_urls and link not in self.failed_urls and not stop_requested:
+                self.visited_urls.add(link)
+                self.pages_to_crawl.append(link)
+                print(f"      🔗 Found new page: {self.get_url_display_name(link)}")
         
-        print(f"✅ Crawl complete: {crawled_pages} pages")
-        
-        # Final asset discovery pass
+        # Download ALL assets including CSS from this page
         if not self.skip_assets and not stop_requested:
-            self.final_asset_discovery(downloaded_content)
+            self.download_all_assets_enhanced(page_data['content'], current_url, downloaded_content,
+                                              parsed['assets'])
+
+    def crawl_pages_in_processes(self, start_url, downloaded_content, crawled_pages):
+        """
+        Crawl loop for --processes N.
+
+        This process owns the frontier, the visited/failed sets, the rate
+        limiter, the transfer budget and the archive writer. Worker processes
+        only fetch and parse pages and send back the page, its links and its
+        asset URLs; assets are then downloaded here on the asset thread pool.
+        """
+        print(f"🧵 Fetching and parsing pages in {self.processes} worker processes")
+        in_flight = {}
+        retries = {}
+        consecutive_failures = 0
+        last_checkpoint = time.time()
+        last_checkpointed_count = crawled_pages
+        initargs = (self.output_dir, self.html_parser, dict(self.session.headers), self.session.cookies)
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=init_crawl_worker,
+                                 initargs=initargs) as executor:
+            while not stop_requested:
+                # Same failure handling as the serial crawl
+                if consecutive_failures >= 3:
+                    print("    🚨 Too many failures, trying recovery...")
+                    if not self.recover_from_failures():
+                        break
+                    consecutive_failures = 0
+
+                # Keep every worker busy without going past max_pages
+                while (self.pages_to_crawl and len(in_flight) < self.processes * 2
+                       and crawled_pages + len(in_flight) < self.max_pages and not stop_requested):
+                    url = self.pages_to_crawl.popleft()
+                    self.rate_limiter.acquire(url)
+                    # Workers copied the session at startup; send the current
+                    # user agent so recovery and pinned user agents reach them
+                    request_headers = dict(self.get_conditional_headers('pages', url) or {})
+                    request_headers['User-Agent'] = self.session.headers['User-Agent']
+                    # The worker's request holds a shared connection slot until
+                    # it finishes, whether or not its result was handled yet
+                    self.budget.acquire()
+                    try:
+                        future = executor.submit(fetch_and_parse_page, url, request_headers)
+                    except Exception:
+                        self.budget.release()
+                        raise
+                    future.add_done_callback(lambda _: self.budget.release())
+                    in_flight[future] = url
+
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'url': url, 'status_code': None, 'elapsed': 0, 'error': str(e)}
+                    # Pages are paced against --max-bandwidth once they arrive
+                    self.budget.consume(result.get('size', 0))
+
+                    if stop_requested:
+                        # Leave unprocessed results for the resumed run
+                        self.pages_to_crawl.appendleft(url)
+                        continue
+
+                    page = self.resolve_worker_page(result, retries)
+                    if page is False:
+                        consecutive_failures += 1
+                        print(f"    ❌ Failed (#{consecutive_failures})")
+                        continue
+                    if not page:
+                        continue
+
+                    page_data, parsed = page
+                    crawled_pages += 1
+                    consecutive_failures = 0
+                    print(f"📄 [{crawled_pages}/{self.max_pages}] {self.get_url_display_name(url)}")
+                    self.record_crawled_page(url, page_data, parsed, downloaded_content)
+                    if stop_requested:
+                        # Assets may be incomplete - crawl this page again on resume
+                        self.pages_to_crawl.appendleft(url)
+                        crawled_pages -= 1
+
+                if self.checkpoint_due(crawled_pages, last_checkpointed_count, last_checkpoint):
+                    self.save_checkpoint(start_url, downloaded_content, crawled_pages, in_flight.values())
+                    last_checkpoint = time.time()
+                    last_checkpointed_count = crawled_pages
+
+            # Pages still being fetched are crawled again on resume
+            self.pages_to_crawl.extendleft(in_flight.values())
+            for future in in_flight:
+                future.cancel()
+
+        return crawled_pages
+
+    def resolve_worker_page(self, result, retries):
+        """
+        Turn a worker's fetch result into (page_data, parsed), with the same
+        retry, 403 fallback and 429 handling as download_with_retry_complete.
+
+        Returns False if the page failed and None if it was queued for
+        another attempt.
+        """
+        url = result['url']
+        status_code = result['status_code']
+        pause = self.rate_limiter.record(url, status_code, result['elapsed'], result.get('retry_after'))
+
+        if status_code == 200:
+            return result['page_data'], {'links': result['links'], 'assets': result['assets']}
+
+        if status_code == 304:
+            page_data = self.reuse_previous('pages', url, result['headers'])
+        elif status_code == 403:
+            # Selenium and alternative downloads only exist in this process
+            print(f"    🚫 403 Forbidden: {url}")
+            page_data = self.download_page_enhanced(url)
+        elif status_code in [404, 410]:
+            print(f"    ❌ {status_code} Not Found: {url}")
+            self.failed_urls.add(url)
+            return False
+        else:
+            retries[url] = retries.get(url, 0) + 1
+            if status_code == 429:
+                print(f"    🐢 429 Rate Limited - pausing host for {pause:.0f}s: {url}")
+            elif status_code:
+                print(f"    ⚠️ HTTP {status_code} for {url}")
+            else:
+                print(f"    ❌ Error: {result.get('error')}")
+
+            if retries[url] < self.max_retries:
+                self.pages_to_crawl.append(url)
+                return None
+            print(f"    ❌ Failed: {self.get_url_display_name(url)}")
+            self.failed_urls.add(url)
+            return False
+
+        if not page_data:
+            print(f"    ❌ Failed: {self.get_url_display_name(url)}")
+            return False
+        return page_data, self.parse_page_html(page_data['content'], url)
+
+    def fetch_page_for_coordinator(self, url, request_headers=None):
+        """
+        Fetch and parse one page inside a --processes worker.
+
+        Makes a single attempt without pacing; the coordinator applies the
+        rate limiter, the transfer budget (from the returned 'size'), retries
+        and fallbacks based on the returned status.
+        """
+        result = {'url': url, 'status_code': None, 'elapsed': 0}
+        start_time = time.monotonic()
+        try:
+            response = self.session.get(url, headers=request_headers, timeout=20, allow_redirects=True)
+        except Exception as e:
+            result['error'] = str(e)
+            return result
+
+        result['elapsed'] = time.monotonic() - start_time
+        result['size'] = len(response.content)
+        result['status_code'] = response.status_code
+        result['retry_after'] = response.headers.get('retry-after')
+        result['headers'] = self.get_stored_headers(response)
+        if response.status_code == 200:
+            result['page_data'] = {
+                'url': response.url,
+                'content': response.text,
+                'content_type': response.headers.get('content-type', 'text/html'),
+                'status_code': 200,
+                'downloaded_with': 'session',
+                'headers': result['headers']
+            }
+            parsed = self.parse_page_html(response.text, url)
+            result['links'] = parsed['links']
+            result['assets'] = parsed['assets']
+        return result
+
+    def save_checkpoint(self, start_url, downloaded_content, crawled_pages, pending=()):
+        """Write the crawl frontier and visited/failed sets next to the staged archive
+
+        pending are URLs taken off the frontier but not finished yet.
+        """
+        if not self.archive_writer:
+            return
+        checkpoint = {
+            'main_url': start_url,
+            'timestamp': downloaded_content['timestamp'],
+            'filename': os.path.basename(self.archive_writer.filepath),
+            'crawled_pages': crawled_pages,
+            'frontier': list(pending) + list(self.pages_to_crawl),
+            'visited': list(self.visited_urls),
+            'failed': list(self.failed_urls)
+        }
+        path = os.path.join(self.archive_writer.staging_dir, 'checkpoint.json')
+        try:
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f, ensure_ascii=False)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            print(f"    ⚠️ Could not write checkpoint: {e}")
+
+    def find_resumable_crawl(self, url):
+        """Find the newest interrupted crawl of this URL that left a checkpoint behind"""
+        staging_root = os.path.join(self.output_dir, '.staging')
+        if not os.path.isdir(staging_root):
+            return None
+
+        domain = urlparse(url).netloc.replace(':', '_')
+        candidates = []
+        for name in os.listdir(staging_root):
+            if not name.startswith(f"{domain}_RELAXED_"):
+                continue
+            checkpoint_path = os.path.join(staging_root, name, 'checkpoint.json')
+            try:
+                with open(checkpoint_path, 'r', encoding='utf-8') as f:
+                    checkpoint = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if checkpoint.get('main_url') == url:
+                checkpoint['staging_dir'] = os.path.join(staging_root, name)
+                candidates.append((os.path.getmtime(checkpoint_path), checkpoint))
+
+        if not candidates:
+            return None
+        return max(candidates, key=lambda item: item[0])[1]
+
+    def load_crawl_delay(self, url):
+        """Read the site's robots.txt Crawl-delay and apply it to the rate limiter"""
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        try:
+            self.rate_limiter.acquire(robots_url)
+            response = self.session.get(robots_url, timeout=10)
+            if response.status_code != 200:
+                return
+            parser = RobotFileParser()
+            parser.parse(response.text.splitlines())
+            delay = parser.crawl_delay(self.session.headers.get('User-Agent', '*')) or parser.crawl_delay('*')
+            if delay:
+                print(f"    🤖 robots.txt Crawl-delay: {delay}s for {parsed.netloc}")
+                self.rate_limiter.set_crawl_delay(parsed.netloc, float(delay))
+        except Exception as e:
+            print(f"    ⚠️ Could not read robots.txt: {e}")
 
     def get_url_display_name(self, url):
         """Get a clean display name for URL"""
@@ -1361,22 +2910,26 @@ class CompleteWebsiteDownloader:
     def download_page_enhanced(self, url):
         """Enhanced page download with multiple fallbacks"""
         # Try direct download first
-        response = self.download_with_retry_complete(url)
+        response = self.download_with_retry_complete(url, headers=self.get_conditional_headers('pages', url))
+        if response and response.status_code == 304:
+            return self.reuse_previous('pages', url, self.get_stored_headers(response))
         if response and response.status_code == 200:
             return {
                 'url': response.url,
                 'content': response.text,
                 'content_type': response.headers.get('content-type', 'text/html'),
                 'status_code': 200,
-                'downloaded_with': 'session'
+                'downloaded_with': 'session',
+                'headers': self.get_stored_headers(response)
             }
         
-        # Try Selenium as fallback
-        if self.driver:
+        # Try Selenium as fallback, borrowing a pooled Chrome if this site has none yet
+        # (unattended runs only use the browser that solved a challenge)
+        if self.driver or (not self.unattended and self.setup_chrome_complete()):
             try:
                 print(f"    🔄 Falling back to Selenium for: {url}")
                 self.driver.get(url)
-                time.sleep(3)
+                self.wait_for_browser(3)
                 return {
                     'url': url,
                     'content': self.driver.page_source,
@@ -1396,156 +2949,182 @@ class CompleteWebsiteDownloader:
             print(f"      🚫 Skipping filtered URL: {url}")
             return None
             
+        conditional_headers = self.get_conditional_headers('assets', url)
         try:
             if any(url.endswith(ext) for ext in self.critical_assets):
-                # Critical assets - be more persistent
-                response = self.download_with_retry_complete(url)
-            else:
-                response = self.session.get(url, timeout=15, stream=True)
-                
-            if response and response.status_code == 200:
-                return self.process_asset_response(response, url)
-            else:
+                # Critical assets - be more persistent, still capped while the body arrives
+                try:
+                    response = self.download_with_retry_complete(url, headers=conditional_headers,
+                                                                 max_bytes=self.max_asset_size)
+                except AssetTooLargeError as e:
+                    print(f"      ⚠️ Skipping large file: {e} - {url}")
+                    return None
+                if response and response.status_code == 304:
+                    return self.reuse_previous('assets', url, self.get_stored_headers(response))
+                if response and response.status_code == 200:
+                    return self.process_asset_response(response, url)
                 return None
+
+            self.rate_limiter.acquire(url)
+            # The streamed body is read while the shared connection slot is held
+            with self.budget.connection():
+                start_time = time.monotonic()
+                try:
+                    response = self.fetcher.fetch(url, headers=conditional_headers, timeout=15, stream=True)
+                except Exception:
+                    self.rate_limiter.record(url, None, 0)
+                    raise
+                # Unread bodies (errors, 304s, skipped files) still hold a
+                # pooled connection until the response is closed
+                try:
+                    self.rate_limiter.record(url, response.status_code, time.monotonic() - start_time,
+                                             response.headers.get('retry-after'))
+                    
+                    if response.status_code == 304:
+                        return self.reuse_previous('assets', url, self.get_stored_headers(response))
+                    if response.status_code == 200:
+                        return self.process_asset_response(response, url, streamed=True)
+                    return None
+                finally:
+                    response.close()
                 
         except Exception as e:
             print(f"      ❌ Error downloading asset {url}: {e}")
             return None
 
-    def process_asset_response(self, response, url):
-        """Process asset response with enhanced content handling"""
+    def process_asset_response(self, response, url, streamed=False):
+        """Process asset response, streaming the body with a size cap
+
+        streamed is True when the body is still on the wire, so the bytes read
+        here count against the shared bandwidth budget.
+        """
         content_type = response.headers.get('content-type', '').lower()
-        content_encoding = response.headers.get('content-encoding', '').lower()
-        
-        # Handle content encoding
-        content = response.content
-        if content_encoding == 'gzip':
-            try:
-                content = gzip.decompress(content)
-            except:
-                pass
-        elif content_encoding == 'br':
-            try:
-                content = brotli.decompress(content)
-            except:
-                pass
-        
-        # Skip very large files (>10MB)
-        if len(content) > 10 * 1024 * 1024:
-            print(f"      ⚠️ Skipping large file: {len(content)//1024}KB - {url}")
+
+        # Skip very large files before reading any of the body
+        declared_size = response.headers.get('content-length', '')
+        if declared_size.isdigit() and int(declared_size) > self.max_asset_size:
+            print(f"      ⚠️ Skipping large file: {int(declared_size)//1024}KB - {url}")
+            if hasattr(response, 'close'):
+                response.close()
+            return None
+
+        # requests already undoes gzip/br Content-Encoding while iterating.
+        # Stylesheets stay in memory for nested asset discovery, everything
+        # else is streamed straight into the archive being written
+        chunks = self.iter_capped_body(response, streamed)
+        member = None
+        content = None
+        try:
+            if self.archive_writer and not url.endswith('.css'):
+                member, size = self.archive_writer.stage_blob(chunks)
+            else:
+                content = b''.join(chunks)
+                size = len(content)
+        except AssetTooLargeError as e:
+            print(f"      ⚠️ Skipping large file: {e} - {url}")
             return None
         
-        # Determine encoding and processing
-        is_binary = any(ct in content_type for ct in ['image', 'font', 'binary', 'octet-stream']) or url.endswith(('.css', '.js'))
-        
-        if is_binary:
-            encoded = base64.b64encode(content).decode('utf-8')
-            encoding = 'base64'
-            
-            # Additional processing for images
-            if 'image' in content_type:
-                try:
-                    img = Image.open(io.BytesIO(content))
+        # Additional processing for images
+        asset_info = {}
+        if 'image' in content_type:
+            try:
+                source = io.BytesIO(content) if member is None else self.archive_writer.member_path(member)
+                with Image.open(source) as img:
                     asset_info = {
                         'format': img.format,
                         'size': img.size,
                         'mode': img.mode
                     }
-                except:
-                    asset_info = {}
-            else:
+            except:
                 asset_info = {}
-                
-            return {
-                'url': url,
-                'content': encoded,
-                'content_type': content_type,
-                'encoding': encoding,
-                'size': len(encoded),
-                'filename': os.path.basename(urlparse(url).path) or 'resource',
-                'asset_info': asset_info,
-                'is_critical': url.endswith(tuple(self.critical_assets))
-            }
+
+        # Raw bytes are stored as their own archive member, so nothing is
+        # base64 encoded or decoded as text here
+        asset_data = {
+            'url': url,
+            'content_type': content_type,
+            'size': size,
+            'filename': os.path.basename(urlparse(url).path) or 'resource',
+            'asset_info': asset_info,
+            'headers': self.get_stored_headers(response),
+            'is_critical': url.endswith(tuple(self.critical_assets))
+        }
+        if member is None:
+            asset_data['content'] = content
+            asset_data['encoding'] = 'binary'
         else:
-            # Text content
-            try:
-                encoded = content.decode('utf-8')
-                encoding = 'text'
-            except UnicodeDecodeError:
-                try:
-                    encoded = content.decode('latin-1')
-                    encoding = 'text'
-                except:
-                    encoded = base64.b64encode(content).decode('utf-8')
-                    encoding = 'base64'
-            
-            return {
-                'url': url,
-                'content': encoded,
-                'content_type': content_type,
-                'encoding': encoding,
-                'size': len(encoded),
-                'filename': os.path.basename(urlparse(url).path) or 'resource',
-                'is_critical': url.endswith(tuple(self.critical_assets))
-            }
+            asset_data['member'] = member
+        return asset_data
+
+    def iter_capped_body(self, response, streamed=False):
+        """Yield the decoded response body in chunks, aborting once it exceeds max_asset_size"""
+        if hasattr(response, 'iter_content'):
+            chunks = response.iter_content(chunk_size=64 * 1024)
+        else:
+            # Selenium fallback responses only carry the finished body
+            chunks = [response.content]
+
+        received = 0
+        for chunk in chunks:
+            received += len(chunk)
+            if received > self.max_asset_size:
+                if hasattr(response, 'close'):
+                    response.close()
+                raise AssetTooLargeError(f"over {self.max_asset_size // (1024 * 1024)}MB")
+            if streamed:
+                self.budget.consume(len(chunk))
+            yield chunk
+
+    def get_conditional_headers(self, kind, url):
+        """Validators from the previous archive for an incremental update"""
+        if not self.previous_archive:
+            return None
+        return self.previous_archive.get_conditional_headers(kind, url) or None
+
+    def reuse_previous(self, kind, url, response_headers):
+        """Copy an unchanged page or asset from the previous archive after a 304"""
+        try:
+            if kind == 'pages':
+                data = self.previous_archive.get_page(url)
+            else:
+                data = self.previous_archive.get_asset(url)
+        except Exception as e:
+            print(f"      ❌ Could not reuse {url} from previous archive: {e}")
+            return None
+
+        # A 304 may carry refreshed validators
+        data['headers'].update(response_headers)
+        with self.state_lock:
+            self.reused_responses += 1
+        return data
+
+    def find_previous_archive(self, url):
+        """Open the newest existing .page file of this site for an incremental update"""
+        domain = urlparse(url).netloc.replace(':', '_')
+        candidates = [os.path.join(self.output_dir, name) for name in os.listdir(self.output_dir)
+                      if name.startswith(f"{domain}_RELAXED_") and name.endswith('.page')]
+        if not candidates:
+            print("ℹ️ No previous archive found - downloading everything")
+            return None
+
+        filepath = max(candidates, key=os.path.getmtime)
+        try:
+            archive = PreviousPageArchive(filepath)
+        except Exception as e:
+            print(f"⚠️ Can't update from {os.path.basename(filepath)}: {e}")
+            return None
+        print(f"🔁 Updating from {os.path.basename(filepath)} "
+              f"({len(archive.pages)} pages, {len(archive.assets)} assets)")
+        return archive
+
+    def get_stored_headers(self, response):
+        """Response headers worth keeping in the archive manifest"""
+        return {name: response.headers[name] for name in STORED_RESPONSE_HEADERS
+                if name in response.headers}
 
     def extract_assets_from_html(self, html, base_url):
         """Extract ALL possible assets from HTML - MORE PERMISSIVE"""
-        soup = BeautifulSoup(html, 'html.parser')
-        assets = set()
-        
-        # Standard tags
-        tags_attrs = [
-            ('link', 'href'),
-            ('script', 'src'),
-            ('img', 'src'),
-            ('source', 'src'),
-            ('source', 'srcset'),
-            ('video', 'poster'),
-            ('audio', 'src'),
-            ('iframe', 'src'),
-            ('embed', 'src'),
-            ('object', 'data'),
-            ('meta', 'content'),
-        ]
-        
-        for tag, attr in tags_attrs:
-            for element in soup.find_all(tag, **{attr: True}):
-                attr_value = element.get(attr)
-                if attr_value:
-                    # Handle srcset (multiple images)
-                    if attr == 'srcset':
-                        for src_entry in attr_value.split(','):
-                            src_url = src_entry.strip().split(' ')[0]
-                            if src_url:
-                                full_url = urljoin(base_url, src_url)
-                                if self.should_download_url(full_url):
-                                    assets.add(full_url)
-                    else:
-                        full_url = urljoin(base_url, attr_value)
-                        if self.should_download_url(full_url):
-                            assets.add(full_url)
-        
-        # Extract from inline styles and JavaScript
-        for style in soup.find_all('style'):
-            if style.string:
-                assets.update(self.extract_urls_from_css(style.string, base_url))
-        
-        for script in soup.find_all('script'):
-            if script.string:
-                assets.update(self.extract_urls_from_js(script.string, base_url))
-        
-        # Extract from tag attributes that might contain URLs
-        for tag in soup.find_all(True):
-            for attr in ['style', 'data-src', 'data-background', 'data-url']:
-                if tag.get(attr):
-                    urls = re.findall(r'url\([\'"]?([^)"\']+)[\'"]?\)', tag.get(attr))
-                    for url in urls:
-                        full_url = urljoin(base_url, url)
-                        if self.should_download_url(full_url):
-                            assets.add(full_url)
-        
-        return assets
+        return self.parse_page_html(html, base_url)['assets']
 
     def extract_urls_from_css(self, css_text, base_url):
         """Extract URLs from CSS text - MORE PERMISSIVE"""
@@ -1562,11 +3141,9 @@ class CompleteWebsiteDownloader:
             for match in matches:
                 url = match.strip()
                 if url and not url.startswith(('data:', 'blob:')):
-                    full_url = urljoin(base_url, url)
-                    if self.should_download_url(full_url):
-                        urls.add(full_url)
+                    urls.add(urljoin(base_url, url))
         
-        return urls
+        return self.url_classifier.filter_downloadable(urls)
 
     def extract_urls_from_js(self, js_text, base_url):
         """Extract URLs from JavaScript text - MORE PERMISSIVE"""
@@ -1584,19 +3161,24 @@ class CompleteWebsiteDownloader:
             for match in matches:
                 url = match[0] if isinstance(match, tuple) else match
                 if url and not url.startswith(('data:', 'blob:', 'javascript:')):
-                    full_url = urljoin(base_url, url)
-                    if self.should_download_url(full_url):
-                        urls.add(full_url)
+                    urls.add(urljoin(base_url, url))
         
-        return urls
+        return self.url_classifier.filter_downloadable(urls)
 
-    def download_all_assets_enhanced(self, html, base_url, downloaded_content):
-        """Enhanced asset download with prioritization"""
-        assets = self.extract_assets_from_html(html, base_url)
+    def download_all_assets_enhanced(self, html, base_url, downloaded_content, assets=None):
+        """Enhanced asset download with prioritization
+
+        assets can be passed in when the page was already parsed by parse_page_html.
+        """
+        if assets is None:
+            assets = self.extract_assets_from_html(html, base_url)
+        assets = set(assets)
         
         # Also get assets from Selenium if available
+        browser_responses = {}
         if self.driver and base_url == self.driver.current_url:
-            selenium_assets = self.get_selenium_network_requests()
+            browser_responses = self.read_browser_responses()
+            selenium_assets = self.url_classifier.filter_downloadable(browser_responses)
             assets.update(selenium_assets)
         
         print(f"    📦 Found {len(assets)} potential assets")
@@ -1605,63 +3187,141 @@ class CompleteWebsiteDownloader:
             print("    ℹ️ No assets found to download")
             return
             
-        # Download all assets that pass our filters
-        successful = 0
+        # Bodies the browser already has are stored as they are, the rest
+        # is downloaded on the worker pool
         total_assets = len(assets)
+        downloaded = {}
+        if self.capture_browser and browser_responses:
+            downloaded = self.capture_browser_assets(browser_responses, assets, downloaded_content)
+        downloaded.update(self.fetch_assets_concurrently(assets, downloaded_content))
+
+        # Process CSS files for nested assets in one more concurrent batch
+        css_assets = set()
+        for asset_url, asset_data in downloaded.items():
+            if asset_url.endswith('.css'):
+                css_assets.update(self.extract_css_asset_urls(asset_data, asset_url))
+        if css_assets and not stop_requested:
+            print(f"      📥 {len(css_assets)} assets referenced from CSS")
+            self.fetch_assets_concurrently(css_assets, downloaded_content)
         
-        for j, asset_url in enumerate(assets):
-            if asset_url in downloaded_content['assets'] or asset_url in self.failed_urls or stop_requested:
+        print(f"    ✅ Downloaded: {len(downloaded)}/{total_assets} assets")
+
+    def get_host_slot(self, url):
+        """Per-host semaphore limiting concurrent connections to one server"""
+        host = urlparse(url).netloc
+        with self.state_lock:
+            slot = self.host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_connections)
+                self.host_slots[host] = slot
+            return slot
+
+    def download_asset_limited(self, url):
+        """Download one asset while holding a connection slot for its host"""
+        if stop_requested:
+            return None
+        with self.get_host_slot(url):
+            return self.download_asset_complete(url)
+
+    def fetch_assets_concurrently(self, asset_urls, downloaded_content):
+        """Download assets on a bounded worker pool, storing each one as it completes
+
+        Returns a dict of asset URL -> asset data for the assets downloaded in this call.
+        """
+        pending = [url for url in asset_urls
+                   if url not in downloaded_content['assets'] and url not in self.failed_urls]
+        downloaded = {}
+        if not pending or stop_requested:
+            return downloaded
+
+        total = len(pending)
+        with ThreadPoolExecutor(max_workers=max(1, self.asset_workers)) as executor:
+            futures = {executor.submit(self.download_asset_limited, url): url for url in pending}
+            # Results are recorded on this thread only, so downloaded_content needs no lock
+            for done, future in enumerate(as_completed(futures), 1):
+                asset_url = futures[future]
+                filename = os.path.basename(urlparse(asset_url).path) or asset_url[:60]
+                try:
+                    asset_data = future.result()
+                except Exception as e:
+                    print(f"      ❌ Error downloading asset {asset_url}: {e}")
+                    asset_data = None
+
+                if asset_data:
+                    self.store_asset(asset_url, asset_data, downloaded_content)
+                    # Only stylesheet bodies are kept around, for nested asset discovery
+                    if asset_url.endswith('.css'):
+                        downloaded[asset_url] = asset_data
+                    else:
+                        downloaded[asset_url] = downloaded_content['assets'][asset_url]
+                    print(f"      📁 [{done}/{total}] {filename}")
+                elif not stop_requested:
+                    print(f"      ❌ Failed: {filename}")
+                    self.failed_urls.add(asset_url)
+
+        return downloaded
+
+    def read_browser_responses(self):
+        """Responses received by Chrome since they were last read
+
+        Returns a dict of URL -> {'request_id', 'status', 'headers'} for
+        Network.responseReceived events in the performance log.
+        """
+        self.drain_network_log()
+        return self.network_log.take()
+
+    def capture_browser_assets(self, browser_responses, asset_urls, downloaded_content):
+        """Store asset bodies Chrome already downloaded instead of fetching them again
+
+        Bodies come from the DevTools Network.getResponseBody command. Assets
+        whose body Chrome no longer holds (evicted, redirected, still loading)
+        are left for the normal download. Returns a dict of asset URL -> asset
+        data like fetch_assets_concurrently.
+        """
+        captured = {}
+        for url in asset_urls:
+            if stop_requested:
+                break
+            response = browser_responses.get(url)
+            if (not response or response['status'] != 200 or not response['request_id']
+                    or url in downloaded_content['assets'] or not self.should_download_url(url)):
                 continue
-            
-            filename = os.path.basename(urlparse(asset_url).path) or asset_url[:60]
-            print(f"      📁 [{successful+1}/{total_assets}] {filename}")
-            
-            asset_data = self.download_asset_complete(asset_url)
-            if asset_data:
-                downloaded_content['assets'][asset_url] = asset_data
-                successful += 1
-                
-                # Process CSS files for nested assets
-                if asset_url.endswith('.css'):
-                    self.download_css_assets(asset_data, asset_url, downloaded_content)
+            try:
+                result = self.driver.execute_cdp_cmd('Network.getResponseBody',
+                                                     {'requestId': response['request_id']})
+            except Exception:
+                continue
+
+            if result.get('base64Encoded'):
+                body = base64.b64decode(result['body'])
             else:
-                print(f"      ❌ Failed: {filename}")
-                self.failed_urls.add(asset_url)
-            
-            time.sleep(0.1)
-        
-        print(f"    ✅ Downloaded: {successful}/{total_assets} assets")
+                body = result['body'].encode('utf-8')
+            asset_data = self.process_asset_response(
+                BufferedResponse(url, 200, response['headers'], body), url)
+            if not asset_data:
+                continue
 
-    def get_selenium_network_requests(self):
-        """Get all network requests from Selenium performance logs"""
-        assets = set()
-        try:
-            logs = self.driver.get_log('performance')
-            for log in logs:
-                try:
-                    message = json.loads(log['message'])
-                    message_type = message.get('message', {}).get('method', '')
-                    
-                    if message_type == 'Network.responseReceived':
-                        response = message['message']['params']['response']
-                        url = response.get('url', '')
-                        if url and self.should_download_url(url):
-                            assets.add(url)
-                except:
-                    continue
-        except Exception as e:
-            print(f"      ⚠️ Selenium network log error: {e}")
-        
-        return assets
+            asset_data['downloaded_with'] = 'browser'
+            self.store_asset(url, asset_data, downloaded_content)
+            self.browser_captured += 1
+            # Only stylesheet bodies are kept around, for nested asset discovery
+            if url.endswith('.css'):
+                captured[url] = asset_data
+            else:
+                captured[url] = downloaded_content['assets'][url]
+            print(f"      🎥 From browser: {os.path.basename(urlparse(url).path) or url[:60]}")
+
+        return captured
 
-    def download_css_assets(self, css_asset, css_url, downloaded_content):
-        """Download assets referenced in CSS files"""
+    def extract_css_asset_urls(self, css_asset, css_url):
+        """Decode a downloaded stylesheet and return the asset URLs it references"""
         try:
             css_content = css_asset['content']
             
-            # Decode if base64 encoded
-            if css_asset['encoding'] == 'base64':
-                css_content = base64.b64decode(css_content)
+            # Decode raw or base64 encoded bytes
+            if css_asset['encoding'] in ('binary', 'base64'):
+                if css_asset['encoding'] == 'base64':
+                    css_content = base64.b64decode(css_content)
                 
                 # Try multiple decoding methods
                 css_text = None
@@ -1681,20 +3341,13 @@ class CompleteWebsiteDownloader:
                 css_text = css_content
             
             if not css_text:
-                return
-            
-            # Extract and download referenced assets
-            css_assets = self.extract_urls_from_css(css_text, css_url)
+                return set()
             
-            for asset_url in css_assets:
-                if asset_url not in downloaded_content['assets'] and asset_url not in self.failed_urls and not stop_requested:
-                    print(f"      📥 CSS asset: {os.path.basename(asset_url) or asset_url[:50]}")
-                    asset_data = self.download_asset_complete(asset_url)
-                    if asset_data:
-                        downloaded_content['assets'][asset_url] = asset_data
+            return self.extract_urls_from_css(css_text, css_url)
             
         except Exception as e:
-            print(f"      ⚠️ CSS asset download error: {e}")
+            print(f"      ⚠️ CSS asset extraction error: {e}")
+            return set()
 
     def final_asset_discovery(self, downloaded_content):
         """Final pass to discover missing assets"""
@@ -1709,15 +3362,15 @@ class CompleteWebsiteDownloader:
             '/manifest.json'
         ]
         
+        candidates = set()
         for page_url in downloaded_content['pages']:
             base_domain = urlparse(page_url).netloc
             for asset_path in common_assets:
-                asset_url = f"https://{base_domain}{asset_path}"
-                if asset_url not in downloaded_content['assets'] and asset_url not in self.failed_urls and not stop_requested:
-                    print(f"    🔎 Checking for common asset: {asset_path}")
-                    asset_data = self.download_asset_complete(asset_url)
-                    if asset_data:
-                        downloaded_content['assets'][asset_url] = asset_data
+                candidates.add(f"https://{base_domain}{asset_path}")
+
+        if candidates and not stop_requested:
+            print(f"    🔎 Checking {len(candidates)} common asset locations")
+            self.fetch_assets_concurrently(candidates, downloaded_content)
 
     def download_website(self, url):
         """Main download method - now handles YouTube specially"""
@@ -1729,20 +3382,25 @@ class CompleteWebsiteDownloader:
             # Use existing website downloader for other sites
             print(f"⬇️ Target: {url}")
             
-            # Manual Cloudflare solve
-            if not self.manual_cloudflare_solve(url):
-                print("❌ Failed to setup Chrome session")
-                return None
-            
-            # Download with complete approach
-            result = self.download_with_session_complete(url)
-            
-            # Cleanup
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
-            
-            return result
+            # The borrowed Chrome goes back to the pool however the download ends,
+            # or the next site waiting for it would block forever
+            try:
+                if self.unattended:
+                    # Browser only if the site actually challenges the session
+                    if not self.prepare_session_unattended(url):
+                        print("❌ Could not get past the site's challenge")
+                        return None
+                elif not self.manual_cloudflare_solve(url):
+                    # Manual Cloudflare solve
+                    print("❌ Failed to setup Chrome session")
+                    return None
+                
+                # Download with complete approach
+                return self.download_with_session_complete(url)
+            finally:
+                # Cleanup
+                self.release_driver()
+                self.fetcher.close()
 
     def download_with_session_complete(self, url):
         """Download using complete approach"""
@@ -1760,9 +3418,55 @@ class CompleteWebsiteDownloader:
         self.visited_urls.clear()
         self.pages_to_crawl.clear()
         self.failed_urls.clear()
+        self.reused_responses = 0
+        self.browser_captured = 0
+
+        if self.update:
+            self.previous_archive = self.find_previous_archive(url)
+
+        checkpoint = self.find_resumable_crawl(url) if self.resume else None
+        if checkpoint:
+            # Continue an interrupted crawl from its checkpoint and staged files
+            filename = checkpoint['filename']
+            filepath = os.path.join(self.output_dir, filename)
+            self.archive_writer = PageArchiveWriter(filepath, checkpoint['staging_dir'], self.blob_store)
+            downloaded_content['timestamp'] = checkpoint['timestamp']
+            downloaded_content['pages'].update(self.archive_writer.manifest['pages'])
+            downloaded_content['assets'].update(self.archive_writer.manifest['assets'])
+            self.pages_to_crawl.extend(checkpoint['frontier'])
+            self.visited_urls.update(checkpoint['visited'])
+            self.failed_urls.update(checkpoint['failed'])
+            resumed_pages = checkpoint['crawled_pages']
+            print(f"⏯️ Resuming crawl: {resumed_pages} pages and "
+                  f"{len(downloaded_content['assets'])} assets already saved, "
+                  f"{len(self.pages_to_crawl)} pages queued")
+        else:
+            # Pages and assets are streamed to disk as they arrive
+            domain = urlparse(url).netloc.replace(':', '_')
+            filename = f"{domain}_RELAXED_{int(time.time())}.page"
+            filepath = os.path.join(self.output_dir, filename)
+            self.archive_writer = PageArchiveWriter(filepath, self.get_staging_dir(filepath), self.blob_store)
+            resumed_pages = None
         
         # Start enhanced crawling
-        self.crawl_website_complete(url, downloaded_content)
+        try:
+            self.crawl_website_complete(url, downloaded_content, resumed_pages)
+        except Exception:
+            print(f"    ⚠️ Crawl aborted - staged files kept in {self.archive_writer.staging_dir}")
+            self.archive_writer = None
+            raise
+        finally:
+            if self.previous_archive:
+                self.previous_archive.close()
+                self.previous_archive = None
+
+        if stop_requested and self.resume:
+            # Keep staged files and checkpoint so the next --resume run continues
+            print(f"⏸️ Crawl interrupted - progress kept in {self.archive_writer.staging_dir}")
+            print("💡 Run the same command again with --resume to continue")
+            self.archive_writer.journal.close()
+            self.archive_writer = None
+            return None
         
         # Statistics
         total_pages = len(downloaded_content['pages'])
@@ -1772,91 +3476,160 @@ class CompleteWebsiteDownloader:
         print(f"    📊 Final Statistics:")
         print(f"    📄 Total pages: {total_pages}")
         print(f"    📦 Total assets: {total_assets}")
+        print(f"    🧬 Unique bodies: {len(self.archive_writer.unique_members())}")
         print(f"    ❌ Failed URLs: {failed_count}")
+        if self.update:
+            print(f"    ♻️ Unchanged (304) reused: {self.reused_responses}")
+        if self.capture_browser:
+            print(f"    🎥 Captured from browser: {self.browser_captured}")
         
         # Save file
-        domain = urlparse(url).netloc.replace(':', '_')
-        filename = f"{domain}_RELAXED_{int(time.time())}.page"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        if self.save_page_file(filepath, downloaded_content):
+        writer = self.archive_writer
+        self.archive_writer = None
+        try:
+            saved = self.finalize_archive(writer, downloaded_content)
+        except Exception as e:
+            print(f"    ❌ Save error: {e}")
+            saved = False
+
+        if saved:
             print(f"💾 Saved: {filename}")
             return filepath
         else:
             print(f"❌ Failed to save: {filename}")
             return None
 
-    def save_page_file(self, filepath, content):
-        """Save as .page file"""
+    def get_staging_dir(self, filepath):
+        """Staging directory used while a .page file is being written"""
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        return os.path.join(self.output_dir, '.staging', name)
+
+    def finalize_archive(self, writer, content):
+        """Write metadata and pack a staged archive into its .page file"""
+        metadata = {
+            'main_url': content['main_url'],
+            'timestamp': content['timestamp'],
+            'version': content['version'],
+            'format': PAGE_FORMAT_VERSION,
+            'pages': len(writer.manifest['pages']),
+            'assets': len(writer.manifest['assets']),
+            'failed_urls': list(self.failed_urls)
+        }
+        if self.store_rewritten:
+            metadata['rewrite_version'] = REWRITE_VERSION
+        writer.finalize(metadata)
+
+        file_size = os.path.getsize(writer.filepath) / (1024 * 1024)
+        print(f"    💾 File size: {file_size:.2f} MB")
+        return os.path.exists(writer.filepath)
+
+    def store_page(self, url, page_data, downloaded_content):
+        """Record a crawled page, spilling its body to the archive writer when streaming"""
+        if self.archive_writer:
+            downloaded_content['pages'][url] = self.archive_writer.add_page(
+                url, page_data, self.get_rewritten_page(page_data))
+        else:
+            downloaded_content['pages'][url] = page_data
+
+    def store_asset(self, url, asset_data, downloaded_content):
+        """Record a downloaded asset, spilling its body to the archive writer when streaming"""
+        if self.archive_writer:
+            # Streamed assets are already staged and only need their manifest entry
+            body = None if 'member' in asset_data else self.get_asset_bytes(asset_data)
+            entry = self.archive_writer.add_asset(url, asset_data, body,
+                                                  self.get_rewritten_stylesheet(url, asset_data, body))
+            downloaded_content['assets'][url] = entry
+        else:
+            downloaded_content['assets'][url] = asset_data
+
+    def get_rewritten_page(self, page_data):
+        """Browser-ready copy of a page for --store-rewritten, or None"""
+        if not self.store_rewritten or not page_data.get('content'):
+            return None
+        rewritten = rewrite_page_links(page_data['content'], page_data.get('url', ''))
+        return rewritten.encode('utf-8') if rewritten is not None else None
+
+    def get_rewritten_stylesheet(self, url, asset_data, body):
+        """Browser-ready copy of a stylesheet for --store-rewritten, or None"""
+        if not self.store_rewritten or body is None:
+            return None
+        if 'text/css' not in asset_data.get('content_type', '') and not urlparse(url).path.endswith('.css'):
+            return None
+        css_url = asset_data.get('url', url)
+        # surrogateescape keeps bytes that aren't UTF-8 unchanged, as the browser does
+        css_text = body.decode('utf-8', errors='surrogateescape')
+        return rewrite_stylesheet(css_text, css_url).encode('utf-8', errors='surrogateescape')
+
+    def get_asset_bytes(self, asset_data):
+        """Raw bytes of an asset regardless of how it is held in memory"""
+        encoding = asset_data.get('encoding', 'text')
+        if encoding == 'binary':
+            return asset_data['content']
+        if encoding == 'base64':
+            return base64.b64decode(asset_data['content'])
+        return asset_data['content'].encode('utf-8')
+
+    def new_site_downloader(self):
+        """Downloader with its own session and crawl state for one site of a parallel run"""
+        return CompleteWebsiteDownloader(rate_limiter=self.rate_limiter, budget=self.budget,
+                                         driver_pool=self.driver_pool, **self.site_options)
+
+    def download_list_entry(self, i, url):
+        """Download one site of a URL list and return the files it produced"""
+        print(f"\n{'='*60}")
+        print(f"#{i}: {url}")
+        print("="*60)
+        
         try:
-            with zipfile.ZipFile(filepath, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Enhanced metadata
-                metadata = {
-                    'main_url': content['main_url'],
-                    'timestamp': content['timestamp'],
-                    'version': content['version'],
-                    'pages': len(content['pages']),
-                    'assets': len(content['assets']),
-                    'failed_urls': list(self.failed_urls)
-                }
-                metadata_json = json.dumps(metadata, indent=2, ensure_ascii=False)
-                zipf.writestr('metadata.json', metadata_json.encode('utf-8'))
-                
-                # Pages
-                for url, data in content['pages'].items():
-                    hash_val = hashlib.md5(url.encode()).hexdigest()[:12]
-                    page_json = json.dumps(data, indent=2, ensure_ascii=False)
-                    zipf.writestr(f"pages/{hash_val}.json", page_json.encode('utf-8'))
+            start_time = time.time()
+            result = self.download_website(url)
+            end_time = time.time()
+            
+            if result:
+                if isinstance(result, list):  # YouTube returns list of files
+                    print(f"✅ YouTube: Downloaded {len(result)} videos ({end_time - start_time:.1f}s)")
+                    return result
+                # Regular website returns single file path
+                print(f"✅ Success! ({end_time - start_time:.1f}s)")
+                return [result]
+            print(f"❌ Failed after {end_time - start_time:.1f}s")
                 
-                # Assets
-                for url, data in content['assets'].items():
-                    hash_val = hashlib.md5(url.encode()).hexdigest()[:12]
-                    asset_json = json.dumps(data, indent=2, ensure_ascii=False)
-                    zipf.writestr(f"assets/{hash_val}.json", asset_json.encode('utf-8'))
-            
-            file_size = os.path.getsize(filepath) / (1024 * 1024)
-            print(f"    💾 File size: {file_size:.2f} MB")
-            return os.path.exists(filepath)
         except Exception as e:
-            print(f"    ❌ Save error: {e}")
-            return False
+            print(f"❌ Error: {e}")
+            import traceback
+            traceback.print_exc()
+        return []
+
+    def download_list_entry_in_new_site(self, i, url):
+        """Parallel-site task: build the site's downloader only once a worker picks the entry up"""
+        return self.new_site_downloader().download_list_entry(i, url)
 
     def download_from_list(self, url_list):
-        """Download multiple sites"""
+        """Download multiple sites, several at a time with --parallel-sites"""
         downloaded_files = []
         
         print(f"🎯 Downloading {len(url_list)} sites with RELAXED FILTERS...")
         print(f"📁 Output: {self.output_dir}")
         
-        for i, url in enumerate(url_list, 1):
-            url = url.strip()
-            if not url:
-                continue
-                
-            print(f"\n{'='*60}")
-            print(f"#{i}: {url}")
-            print("="*60)
-            
-            try:
-                start_time = time.time()
-                result = self.download_website(url)
-                end_time = time.time()
-                
-                if result:
-                    if isinstance(result, list):  # YouTube returns list of files
-                        downloaded_files.extend(result)
-                        print(f"✅ YouTube: Downloaded {len(result)} videos ({end_time - start_time:.1f}s)")
-                    else:  # Regular website returns single file path
-                        downloaded_files.append(result)
-                        print(f"✅ Success! ({end_time - start_time:.1f}s)")
-                else:
-                    print(f"❌ Failed after {end_time - start_time:.1f}s")
-                    
-            except Exception as e:
-                print(f"❌ Error: {e}")
-                import traceback
-                traceback.print_exc()
-        
+        entries = [(i, url.strip()) for i, url in enumerate(url_list, 1) if url.strip()]
+        if self.driver_pool is None:
+            self.driver_pool = ChromeDriverPool(size=self.parallel_sites, headless=self.unattended)
+        try:
+            if self.parallel_sites > 1 and len(entries) > 1:
+                print(f"🧵 Crawling up to {self.parallel_sites} sites at once")
+                with ThreadPoolExecutor(max_workers=self.parallel_sites) as executor:
+                    futures = [executor.submit(self.download_list_entry_in_new_site, i, url)
+                               for i, url in entries]
+                    for future in futures:
+                        downloaded_files.extend(future.result())
+            else:
+                for i, url in entries:
+                    downloaded_files.extend(self.download_list_entry(i, url))
+        finally:
+            # Don't leave Chrome processes behind if a site raised
+            if self.owns_driver_pool:
+                self.driver_pool.close()
+
         print(f"\n{'='*60}")
         print(f"📊 Complete: {len(downloaded_files)} items downloaded")
         print(f"💾 Location: {self.output_dir}")
@@ -1864,6 +3637,26 @@ class CompleteWebsiteDownloader:
         return downloaded_files
 
 
+# --processes worker state: one downloader per worker process, used for
+# fetching and parsing only
+_crawl_worker = None
+
+
+def init_crawl_worker(output_dir, html_parser, headers, cookies):
+    """Process pool initializer for --processes crawls"""
+    global _crawl_worker
+    # The coordinator handles Ctrl+C and requeues unfinished pages
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _crawl_worker = CompleteWebsiteDownloader(output_dir=output_dir, html_parser=html_parser)
+    _crawl_worker.session.headers.update(headers)
+    _crawl_worker.session.cookies.update(cookies)
+
+
+def fetch_and_parse_page(url, request_headers=None):
+    """Fetch and parse one page in a worker process"""
+    return _crawl_worker.fetch_page_for_coordinator(url, request_headers)
+
+
 def main():
     """Main entry point - preserves original behavior when no flags are used"""
     import sys
@@ -1980,6 +3773,112 @@ def run_with_cli():
         action='store_true',
         help='Skip downloading assets (CSS, images, etc.)'
     )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted website crawl from its last checkpoint'
+    )
+    parser.add_argument(
+        '--update',
+        action='store_true',
+        help='Only re-download pages and assets that changed since the newest existing archive of the site'
+    )
+    parser.add_argument(
+        '--blob-store',
+        metavar='DIR',
+        help='Keep page/asset bodies in a content-addressed store shared by all archives'
+    )
+    parser.add_argument(
+        '--parser',
+        choices=['html.parser', 'lxml'],
+        default='html.parser',
+        help='HTML parser backend; lxml is much faster on large pages if installed (default: html.parser)'
+    )
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Fetch and parse pages in N worker processes (default: 1, no worker processes)'
+    )
+    parser.add_argument(
+        '--http-engine',
+        choices=['requests', 'httpx'],
+        default='requests',
+        help='HTTP engine: blocking requests, or asyncio httpx with keep-alive and HTTP/2 (default: requests)'
+    )
+    parser.add_argument(
+        '--parallel-sites',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Download up to N sites of the URL list at the same time (default: 1)'
+    )
+    parser.add_argument(
+        '--max-connections',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Limit on concurrent requests across all sites (default: 0, unlimited)'
+    )
+    parser.add_argument(
+        '--max-bandwidth',
+        type=int,
+        default=0,
+        metavar='KBPS',
+        help='Limit on the combined download rate in KB/s across all sites (default: 0, unlimited)'
+    )
+    parser.add_argument(
+        '--unattended',
+        action='store_true',
+        help='No prompts: crawl with the plain session and only use headless Chrome for sites that return a challenge (implied by -q)'
+    )
+    parser.add_argument(
+        '--ready-selector',
+        metavar='CSS',
+        help='CSS selector that must be present before a challenged page counts as loaded (unattended mode)'
+    )
+    parser.add_argument(
+        '--challenge-timeout',
+        type=int,
+        default=30,
+        metavar='SECONDS',
+        help='How long to wait for a challenge to clear in unattended mode (default: 30)'
+    )
+    parser.add_argument(
+        '--capture-browser',
+        action='store_true',
+        help='Store asset bodies Chrome already loaded (DevTools protocol) instead of downloading them again'
+    )
+    parser.add_argument(
+        '--store-rewritten',
+        action='store_true',
+        help='Also store copies of pages and stylesheets with links rewritten for page-browser.py, so it can serve them without parsing'
+    )
+    parser.add_argument(
+        '--asset-workers',
+        type=int,
+        default=8,
+        help='Number of assets to download concurrently (default: 8)'
+    )
+    parser.add_argument(
+        '--per-host-connections',
+        type=int,
+        default=4,
+        help='Maximum concurrent asset downloads from one host (default: 4)'
+    )
+    parser.add_argument(
+        '--host-rate',
+        type=float,
+        default=2.0,
+        help='Initial requests per second per host, adapted to server responses (default: 2)'
+    )
+    parser.add_argument(
+        '--max-host-rate',
+        type=float,
+        default=8.0,
+        help='Upper limit for the adaptive per-host request rate (default: 8)'
+    )
     
     # YouTube specific
     parser.add_argument(
@@ -1997,6 +3896,10 @@ def run_with_cli():
     )
     
     args = parser.parse_args()
+    if args.host_rate <= 0:
+        parser.error('--host-rate must be greater than 0')
+    if args.max_host_rate <= 0:
+        parser.error('--max-host-rate must be greater than 0')
     
     # Get URLs to download
     urls = []
@@ -2051,10 +3954,15 @@ def run_with_cli():
     print("🚀 COMPLETE WEBSITE DOWNLOADER WITH YOUTUBE SUPPORT")
     print("="*60)
     
-    # Process each URL
-    downloaded_files = []
-    
-    for i, url in enumerate(urls, 1):
+    # Shared by every site so parallel crawls stay within one budget
+    rate_limiter = HostRateLimiter(rate=args.host_rate, max_rate=args.max_host_rate)
+    budget = TransferBudget(max_connections=args.max_connections,
+                            max_bytes_per_second=args.max_bandwidth * 1024)
+    driver_pool = None
+    unattended = args.unattended or args.quiet
+
+    def download_url(i, url):
+        """Download one URL and return the files it produced"""
         print(f"\n📥 Downloading {i}/{len(urls)}: {url}")
         
         # Determine mode
@@ -2079,25 +3987,63 @@ def run_with_cli():
                     yt_format=args.yt_format,
                     yt_quality=args.yt_quality
                 )
-                result = downloader.download_youtube_with_suggestions(url)
-                if result:
-                    downloaded_files.extend(result)
+                return downloader.download_youtube_with_suggestions(url) or []
             else:
-                # Use website downloader
+                # Use website downloader, each site with its own session and crawl state
                 output_dir = args.output or os.path.join(os.getcwd(), "downloaded_sites")
                 downloader = CompleteWebsiteDownloader(
                     output_dir=output_dir,
                     max_pages=args.max_pages,
-                    skip_assets=args.skip_assets
+                    skip_assets=args.skip_assets,
+                    asset_workers=args.asset_workers,
+                    per_host_connections=args.per_host_connections,
+                    rate_limiter=rate_limiter,
+                    resume=args.resume,
+                    update=args.update,
+                    blob_store=args.blob_store,
+                    html_parser=args.parser,
+                    processes=args.processes,
+                    http_engine=args.http_engine,
+                    budget=budget,
+                    driver_pool=driver_pool,
+                    unattended=unattended,
+                    ready_selector=args.ready_selector,
+                    challenge_timeout=args.challenge_timeout,
+                    capture_browser=args.capture_browser,
+                    store_rewritten=args.store_rewritten
                 )
                 result = downloader.download_website(url)
-                if result:
-                    downloaded_files.append(result)
+                return [result] if result else []
                     
         except Exception as e:
             print(f"❌ Error downloading {url}: {e}")
             import traceback
             traceback.print_exc()
+            return []
+
+    # Chrome instances shared by all website downloads of this run; warmed up
+    # front only when every site is going to use one
+    if not args.youtube and any('youtube.com' not in url and 'youtu.be' not in url for url in urls):
+        driver_pool = ChromeDriverPool(size=args.parallel_sites, headless=unattended)
+        if not unattended:
+            driver_pool.prewarm()
+
+    # Process each URL
+    downloaded_files = []
+    
+    try:
+        if args.parallel_sites > 1 and len(urls) > 1:
+            print(f"🧵 Downloading up to {args.parallel_sites} sites at once")
+            with ThreadPoolExecutor(max_workers=args.parallel_sites) as executor:
+                futures = [executor.submit(download_url, i, url) for i, url in enumerate(urls, 1)]
+                for future in futures:
+                    downloaded_files.extend(future.result())
+        else:
+            for i, url in enumerate(urls, 1):
+                downloaded_files.extend(download_url(i, url))
+    finally:
+        if driver_pool:
+            driver_pool.close()
     
     # Print summary
     if downloaded_files:
@@ -2154,6 +4100,8 @@ def run_original_behavior():
 
 
 if __name__ == "__main__":
+    # Needed for --processes in frozen (PyInstaller) Windows builds
+    multiprocessing.freeze_support()
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,91 @@
+"""
+Link rewriting shared by page-browser.py, which rewrites pages and
+stylesheets as it serves them, and page-downloader.py, which can store
+rewritten copies up front with --store-rewritten.
+
+Pages link to /page/<url> and load their resources from /asset/<url> on
+the browser's local server.
+"""
+import re
+from urllib.parse import urlparse, urljoin
+
+from bs4 import BeautifulSoup
+
+# Archives saved with --store-rewritten record this as rewrite_version in
+# their metadata, and the browser only serves the stored copies while it
+# still matches. Bump it whenever the rewriting below changes
+REWRITE_VERSION = 1
+
+CSS_URL_PATTERN = re.compile(r'url\([\'"]?([^)\'"]+)[\'"]?\)')
+CSS_IMPORT_PATTERN = re.compile(r'@import\s+([\'"])([^\'"]+)\1')
+
+
+def rewrite_links(html, base_url):
+    """Rewrite links in HTML to work with offline browser; raises if the page can't be parsed"""
+    soup = BeautifulSoup(html, 'html.parser')
+    base_domain = urlparse(base_url).netloc
+
+    # Rewrite <a> tags
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if href and not href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            if href.startswith(('http://', 'https://')):
+                # External link from same domain
+                if base_domain in href:
+                    link['href'] = f"/page/{href}"
+            elif href.startswith('/'):
+                # Absolute path - convert to full URL
+                full_url = f"{urlparse(base_url).scheme}://{base_domain}{href}"
+                link['href'] = f"/page/{full_url}"
+            else:
+                # Relative path
+                full_url = urljoin(base_url, href)
+                link['href'] = f"/page/{full_url}"
+
+    # Rewrite resource links to use our asset server
+    rewrite_resource_links(soup, base_url)
+
+    return str(soup)
+
+
+def rewrite_resource_links(soup, base_url):
+    """Rewrite resource links (CSS, JS, images) to use asset server"""
+    try:
+        # Scripts, stylesheets and images go through the asset server
+        for tag_name, attribute, skipped in (('script', 'src', ('data:', 'blob:', 'javascript:')),
+                                             ('link', 'href', ('data:', 'blob:')),
+                                             ('img', 'src', ('data:', 'blob:'))):
+            for tag in soup.find_all(tag_name, **{attribute: True}):
+                value = tag[attribute]
+                if value and not value.startswith(skipped):
+                    if value.startswith(('http://', 'https://')):
+                        tag[attribute] = f"/asset/{value}"
+                    else:
+                        tag[attribute] = f"/asset/{urljoin(base_url, value)}"
+
+        # Rewrite CSS url() references in style tags and style attributes
+        for style in soup.find_all('style'):
+            if style.string:
+                style.string = CSS_URL_PATTERN.sub(lambda m: rewrite_css_url(m.group(1), base_url), style.string)
+        for tag in soup.find_all(style=True):
+            if tag['style']:
+                tag['style'] = CSS_URL_PATTERN.sub(lambda m: rewrite_css_url(m.group(1), base_url), tag['style'])
+
+    except Exception as e:
+        print(f"❌ Error rewriting resource links: {e}")
+
+
+def rewrite_css_url(url, base_url):
+    """Rewrite a CSS URL to use asset server"""
+    if url.startswith(('data:', 'blob:')):
+        return f'url({url})'
+    if url.startswith(('http://', 'https://')):
+        return f'url(/asset/{url})'
+    return f'url(/asset/{urljoin(base_url, url)})'
+
+
+def rewrite_stylesheet(css_text, css_url):
+    """Point a stylesheet's url() and @import references at the asset server"""
+    css_text = CSS_URL_PATTERN.sub(lambda m: rewrite_css_url(m.group(1), css_url), css_text)
+    return CSS_IMPORT_PATTERN.sub(
+        lambda m: f'@import {m.group(1)}/asset/{urljoin(css_url, m.group(2))}{m.group(1)}', css_text)
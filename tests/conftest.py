@@ -0,0 +1,70 @@
+import importlib.util
+import json
+import os
+import signal
+import sys
+import zipfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The scripts import page_rewrite from their own directory
+sys.path.insert(0, REPO_DIR)
+
+
+def load_script(module_name, filename):
+    """Import one of the hyphenated top-level scripts as a module"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    # page-downloader.py installs its own Ctrl+C handler on import
+    previous_handler = signal.getsignal(signal.SIGINT)
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+    return module
+
+
+@pytest.fixture(scope='session')
+def downloader():
+    return load_script('page_downloader', 'page-downloader.py')
+
+
+@pytest.fixture(scope='session')
+def browser():
+    return load_script('page_browser', 'page-browser.py')
+
+
+def write_page_file(path, metadata, members):
+    """Write a .page archive from a metadata dict and {member name: bytes}"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr('metadata.json', json.dumps(metadata))
+        for name, body in members.items():
+            zipf.writestr(name, body)
+    return str(path)
+
+
+@pytest.fixture
+def make_archive(downloader):
+    """Save a website .page file with the downloader's own archive writer"""
+    def make(path, main_url, pages, assets=None, rewritten=False, blob_store=None):
+        path = str(path)
+        staging_dir = os.path.join(os.path.dirname(path), '.staging', os.path.basename(path))
+        writer = downloader.PageArchiveWriter(path, staging_dir, blob_store)
+        for url, html in pages.items():
+            page_data = {'url': url, 'content': html, 'content_type': 'text/html', 'status_code': 200}
+            copy = downloader.rewrite_page_links(html, url).encode('utf-8') if rewritten else None
+            writer.add_page(url, page_data, copy)
+        for url, (content_type, body) in (assets or {}).items():
+            copy = None
+            if rewritten and content_type == 'text/css':
+                copy = downloader.rewrite_stylesheet(body.decode('utf-8'), url).encode('utf-8')
+            writer.add_asset(url, {'url': url, 'content_type': content_type, 'size': len(body)}, body, copy)
+        metadata = {'main_url': main_url, 'format': downloader.PAGE_FORMAT_VERSION}
+        if rewritten:
+            metadata['rewrite_version'] = downloader.REWRITE_VERSION
+        return writer.finalize(metadata)
+    return make
@@ -0,0 +1,363 @@
+import http.client
+import json
+import os
+import sqlite3
+import threading
+import types
+import zipfile
+
+import pytest
+
+from conftest import write_page_file
+
+
+
+def load_browser(browser, directory, **options):
+    page_browser = browser.PageFileBrowser(str(directory), **options)
+    page_browser.load_all_page_files()
+    return page_browser
+
+
+def test_persistent_index_reused_for_unchanged_archive(browser, make_archive, tmp_path, monkeypatch):
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/': '<p>home</p>'})
+    load_browser(browser, tmp_path, lazy=True)
+
+    def fail(self, filepath):
+        raise AssertionError(f'{filepath} was re-read although it did not change')
+    monkeypatch.setattr(browser.PageFileBrowser, 'load_page_file', fail)
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+
+    assert page_browser.find_page_by_url('https://a.test/')['content'] == '<p>home</p>'
+
+
+def test_persistent_index_rescans_changed_archive(browser, make_archive, tmp_path):
+    path = make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/old': '<p>old</p>'})
+    load_browser(browser, tmp_path, lazy=True)
+
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/new': '<p>new</p>'})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+
+    assert page_browser.find_page_entry('https://a.test/new') is not None
+    assert 'https://a.test/old' not in page_browser.page_index
+
+
+def test_persistent_index_forgets_deleted_archives(browser, make_archive, tmp_path):
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/': 'a'})
+    path = make_archive(tmp_path / 'b.page', 'https://b.test/', {'https://b.test/': 'b'})
+    load_browser(browser, tmp_path, lazy=True)
+
+    os.remove(path)
+    load_browser(browser, tmp_path, lazy=True)
+
+    conn = sqlite3.connect(str(tmp_path / '.page_index.sqlite'))
+    archives = [row[0] for row in conn.execute('SELECT path FROM archives')]
+    entries = conn.execute('SELECT COUNT(*) FROM entries WHERE archive = ?', (path,)).fetchone()[0]
+    conn.close()
+    assert archives == [str(tmp_path / 'a.page')]
+    assert entries == 0
+
+
+def test_persistent_index_rebuilt_after_schema_change(browser, tmp_path):
+    db_path = str(tmp_path / 'index.sqlite')
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE archives (path TEXT)')
+    conn.execute("INSERT INTO archives VALUES ('stale')")
+    conn.execute('PRAGMA user_version = 1')
+    conn.commit()
+    conn.close()
+
+    index = browser.PersistentPageIndex(db_path)
+    try:
+        assert index.lookup_archive('stale', 0, 0) is None
+        assert index.conn.execute('PRAGMA user_version').fetchone()[0] == index.SCHEMA_VERSION
+    finally:
+        index.close()
+
+
+def build_lookup_site(make_archive, tmp_path):
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {
+        'https://a.test/': '<p>home</p>',
+        'https://a.test/docs/guide.html': '<p>guide</p>',
+    }, {
+        'https://a.test/w/assets/latest/font.woff2': ('font/woff2', b'latest'),
+        'https://a.test/w/assets/v1/font.woff2': ('font/woff2', b'v1'),
+        'https://a.test/css/site.css': ('text/css', b'body{}'),
+    })
+
+
+def test_page_lookup_by_url_scheme_and_path(browser, make_archive, tmp_path):
+    build_lookup_site(make_archive, tmp_path)
+    page_browser = load_browser(browser, tmp_path)
+
+    assert page_browser.find_page_by_url('https://a.test/docs/guide.html')['content'] == '<p>guide</p>'
+    # Scheme-agnostic and path-only matches
+    assert page_browser.find_page_by_url('http://a.test/docs/guide.html')['content'] == '<p>guide</p>'
+    assert page_browser.find_page_by_url('https://mirror.test/docs/guide.html')['content'] == '<p>guide</p>'
+    # Partial path on the same host
+    assert page_browser.find_page_by_url('https://a.test/guide')['content'] == '<p>guide</p>'
+    assert page_browser.find_page_by_url('https://other.test/missing') is None
+
+
+def test_asset_suffix_trie_matches_trailing_path_segments(browser, make_archive, tmp_path):
+    build_lookup_site(make_archive, tmp_path)
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+
+    assert page_browser.find_asset_by_relative_path('/w/assets/v1/font.woff2')['content'] == b'v1'
+    assert page_browser.find_asset_by_relative_path('latest/font.woff2')['content'] == b'latest'
+    # An ambiguous suffix resolves to the first asset indexed, like the old linear scan
+    assert page_browser.find_asset_by_relative_path('font.woff2')['content'] == b'latest'
+    assert page_browser.find_asset_by_relative_path('v2/font.woff2') is None
+    assert page_browser.find_asset_by_relative_path('x/w/assets/v1/font.woff2') is None
+
+
+def test_asset_lookup_by_url_and_filename(browser, make_archive, tmp_path):
+    build_lookup_site(make_archive, tmp_path)
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+
+    assert page_browser.find_asset_by_url('http://a.test/css/site.css')['content'] == b'body{}'
+    assert page_browser.find_asset_by_url('https://cdn.test/static/site.css')['content'] == b'body{}'
+    assert page_browser.find_asset_by_url('https://a.test/css/other.css') is None
+
+
+def test_first_loaded_site_wins_a_shared_url(browser, make_archive, tmp_path):
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://shared.test/': 'first'})
+    make_archive(tmp_path / 'b.page', 'https://b.test/', {'https://shared.test/': 'second'})
+    page_browser = load_browser(browser, tmp_path)
+
+    first_site = next(iter(page_browser.loaded_sites.values()))
+    expected = first_site['pages']['https://shared.test/']['content']
+    assert page_browser.find_page_by_url('https://shared.test/')['content'] == expected
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_reads_format_v3_raw_members(browser, tmp_path, lazy):
+    manifest = {
+        'format': 3,
+        'pages': {'https://a.test/': {'member': 'pages/1.html', 'content_type': 'text/html',
+                                      'headers': {'etag': '"p"'}}},
+        'assets': {'https://a.test/logo.png': {'member': 'assets/2.bin', 'content_type': 'image/png'}},
+    }
+    write_page_file(tmp_path / 'v3.page', {'main_url': 'https://a.test/', 'format': 3}, {
+        'manifest.json': json.dumps(manifest),
+        'pages/1.html': '<p>caf\u00e9</p>'.encode('utf-8'),
+        'assets/2.bin': b'\x89PNG\x00',
+    })
+    page_browser = load_browser(browser, tmp_path, lazy=lazy)
+
+    assert page_browser.find_page_by_url('https://a.test/')['content'] == '<p>caf\u00e9</p>'
+    asset = page_browser.find_asset_by_url('https://a.test/logo.png')
+    assert asset['content'] == b'\x89PNG\x00'
+    assert asset['encoding'] == 'binary'
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_reads_format_v2_json_members_without_manifest(browser, tmp_path, lazy):
+    page = {'url': 'https://a.test/', 'content': '<p>v2</p>', 'content_type': 'text/html'}
+    asset = {'url': 'https://a.test/s.css', 'content': 'body{}', 'encoding': 'text',
+             'content_type': 'text/css'}
+    write_page_file(tmp_path / 'v2.page', {'main_url': 'https://a.test/'}, {
+        'pages/1.json': json.dumps(page),
+        'assets/2.json': json.dumps(asset),
+    })
+    page_browser = load_browser(browser, tmp_path, lazy=lazy)
+
+    assert page_browser.find_page_by_url('https://a.test/')['content'] == '<p>v2</p>'
+    assert page_browser.find_asset_by_url('https://a.test/s.css')['content'] == 'body{}'
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_reads_format_v4_blobs_from_a_shared_store(browser, make_archive, tmp_path, lazy):
+    sites = tmp_path / 'sites'
+    sites.mkdir()
+    path = make_archive(sites / 'a.page', 'https://a.test/', {'https://a.test/': '<p>home</p>'},
+                        {'https://a.test/a.js': ('text/javascript', b'same'),
+                         'https://a.test/b.js': ('text/javascript', b'same')},
+                        blob_store=str(sites / 'blobs'))
+    with zipfile.ZipFile(path) as zipf:
+        assert not [name for name in zipf.namelist() if name.startswith('blobs/')]
+    page_browser = load_browser(browser, sites, lazy=lazy)
+
+    assert page_browser.find_page_by_url('https://a.test/')['content'] == '<p>home</p>'
+    assert page_browser.find_asset_by_url('https://a.test/b.js')['content'] == b'same'
+
+
+def test_blob_store_option_overrides_recorded_location(browser, make_archive, tmp_path):
+    sites = tmp_path / 'sites'
+    sites.mkdir()
+    make_archive(sites / 'a.page', 'https://a.test/', {'https://a.test/': '<p>moved</p>'},
+                 blob_store=str(sites / 'blobs'))
+    os.rename(sites / 'blobs', tmp_path / 'moved-blobs')
+    page_browser = load_browser(browser, sites, lazy=True, blob_store=str(tmp_path / 'moved-blobs'))
+
+    assert page_browser.find_page_by_url('https://a.test/')['content'] == '<p>moved</p>'
+
+
+def test_serves_pages_rewritten_at_save_time_without_parsing(browser, make_archive, tmp_path, monkeypatch):
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/': '<a href="/about">about</a>'},
+                 rewritten=True)
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+
+    def fail(html, base_url):
+        raise AssertionError('stored rewritten page was parsed again')
+    monkeypatch.setattr(browser, 'rewrite_links', fail)
+    body = page_browser.render_page(page_browser.find_page_entry('https://a.test/'))
+
+    assert body == b'<a href="/page/https://a.test/about">about</a>'
+
+
+def test_ignores_rewritten_copies_from_another_rewrite_version(browser, make_archive, tmp_path, monkeypatch):
+    make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/': '<a href="/about">about</a>'},
+                 rewritten=True)
+    monkeypatch.setattr(browser, 'REWRITE_VERSION', browser.REWRITE_VERSION + 1)
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+    calls = []
+    original = browser.rewrite_links
+
+    def counting(html, base_url):
+        calls.append(base_url)
+        return original(html, base_url)
+    monkeypatch.setattr(browser, 'rewrite_links', counting)
+
+    body = page_browser.render_page(page_browser.find_page_entry('https://a.test/'))
+
+    assert calls == ['https://a.test/']
+    assert body == b'<a href="/page/https://a.test/about">about</a>'
+
+
+def test_page_cache_evicts_least_recently_used_bodies(browser):
+    cache = browser.RenderedPageCache(1000)
+    for key in range(3):
+        assert cache.put(key, b'x' * 300)
+    cache.get(0)
+    assert cache.put(3, b'y' * 300)
+
+    assert 1 not in cache.entries
+    assert set(cache.entries) == {0, 2, 3}
+    assert cache.size == 900
+    assert not cache.put('huge', b'z' * 1001)
+
+
+def test_page_cache_put_without_eviction_reports_a_full_cache(browser):
+    cache = browser.RenderedPageCache(1000)
+    stored = [cache.put(key, b'x' * 300, evict=False) for key in range(50)]
+
+    assert stored.count(True) == 3
+    assert set(cache.entries) == {0, 1, 2}
+    # Replacing an entry only needs the difference in size
+    assert cache.put(0, b'y' * 400, evict=False)
+    assert cache.size == 1000
+
+
+def test_prewarm_stops_once_the_cache_is_full(browser, make_archive, tmp_path, monkeypatch):
+    pages = {f'https://a.test/{i}': f'<p>{i}</p>' + 'a' * 1000 for i in range(40)}
+    make_archive(tmp_path / 'a.page', 'https://a.test/', pages)
+    page_browser = load_browser(browser, tmp_path, lazy=True)
+    page_browser.page_cache = browser.RenderedPageCache(5000)
+
+    class InlineThread:
+        def __init__(self, target, **kwargs):
+            self.target = target
+
+        def start(self):
+            self.target()
+    monkeypatch.setattr(browser, 'threading', types.SimpleNamespace(Thread=InlineThread))
+    built = []
+    original = page_browser.build_page
+
+    def counting(entry):
+        built.append(entry['url'])
+        return original(entry)
+    monkeypatch.setattr(page_browser, 'build_page', counting)
+    page_browser.prewarm_page_cache()
+
+    assert len(page_browser.page_cache.entries) == 4
+    # Only the page that no longer fit was rendered in vain
+    assert len(built) == 5
+
+
+VIDEO = bytes(range(256)) * 40
+
+
+def write_video_page(path, compression):
+    metadata = {'type': 'youtube_video', 'video_id': 'vid1', 'title': 'Clip',
+                'original_url': 'https://yt.test/v'}
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr('metadata.json', json.dumps(metadata))
+        zipf.writestr('index.html', '<video src="video.mp4"></video>')
+        zipf.writestr('video.mp4', VIDEO, compress_type=compression)
+
+
+@pytest.fixture
+def video_server(browser, tmp_path, request):
+    write_video_page(tmp_path / 'clip.page', request.param)
+    page_browser = load_browser(browser, tmp_path)
+    browser.RobustPageFileRequestHandler.page_browser = page_browser
+    server = browser.ThreadingHTTPServer(('127.0.0.1', 0), browser.RobustPageFileRequestHandler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield page_browser, server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def get_video(port, range_header=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    headers = {'Range': range_header} if range_header else {}
+    connection.request('GET', '/temp_videos/vid1.mp4', headers=headers)
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+@pytest.mark.parametrize('video_server', [zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED], indirect=True,
+                         ids=['stored', 'deflated'])
+def test_video_range_requests(video_server):
+    page_browser, port = video_server
+    size = len(VIDEO)
+
+    response, body = get_video(port)
+    assert response.status == 200
+    assert response.getheader('Accept-Ranges') == 'bytes'
+    assert body == VIDEO
+
+    response, body = get_video(port, 'bytes=100-199')
+    assert response.status == 206
+    assert response.getheader('Content-Range') == f'bytes 100-199/{size}'
+    assert body == VIDEO[100:200]
+
+    response, body = get_video(port, f'bytes={size - 10}-')
+    assert response.status == 206
+    assert body == VIDEO[-10:]
+
+    response, body = get_video(port, 'bytes=-5')
+    assert response.getheader('Content-Range') == f'bytes {size - 5}-{size - 1}/{size}'
+    assert body == VIDEO[-5:]
+
+    response, body = get_video(port, f'bytes={size}-')
+    assert response.status == 416
+    assert response.getheader('Content-Range') == f'bytes */{size}'
+
+
+@pytest.mark.parametrize('video_server', [zipfile.ZIP_STORED], indirect=True)
+def test_stored_video_is_served_from_the_archive(video_server):
+    page_browser, port = video_server
+    page_file = page_browser.youtube_videos[0]['filepath']
+
+    offset, size = page_browser.locate_stored_video(page_file)
+    with open(page_file, 'rb') as f:
+        f.seek(offset)
+        assert f.read(size) == VIDEO
+    response, body = get_video(port, 'bytes=0-9')
+    assert body == VIDEO[:10]
+    # Nothing was extracted to the temp directory
+    assert os.listdir(page_browser.temp_dir) == []
+
+
+@pytest.mark.parametrize('video_server', [zipfile.ZIP_DEFLATED], indirect=True)
+def test_compressed_video_is_extracted_before_serving(video_server):
+    page_browser, port = video_server
+
+    assert page_browser.locate_stored_video(page_browser.youtube_videos[0]['filepath']) is None
+    assert os.listdir(page_browser.temp_dir) == ['vid1.mp4']
@@ -0,0 +1,268 @@
+import http.server
+import json
+import os
+import threading
+import time
+import zipfile
+
+import pytest
+
+
+@pytest.fixture
+def site_downloader(downloader, tmp_path):
+    return downloader.CompleteWebsiteDownloader(output_dir=str(tmp_path / 'out'))
+
+
+class ValidatingHandler(http.server.BaseHTTPRequestHandler):
+    """Answers 304 when If-None-Match carries the current ETag"""
+    etag = '"v1"'
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.send_header('ETag', self.etag)
+            self.send_header('Cache-Control', 'max-age=60')
+            self.end_headers()
+            return
+        body = b'<p>fresh</p>' if self.path.endswith('/') else b'fresh-asset'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html' if self.path.endswith('/') else 'text/javascript')
+        self.send_header('ETag', '"v2"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def validating_server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), ValidatingHandler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+def read_manifest(path):
+    with zipfile.ZipFile(path) as zipf:
+        return json.loads(zipf.read('manifest.json')), zipf.namelist()
+
+
+def test_identical_bodies_are_stored_once(make_archive, tmp_path):
+    path = make_archive(tmp_path / 'a.page', 'https://a.test/', {'https://a.test/': '<p>home</p>'},
+                        {'https://a.test/a.js': ('text/javascript', b'same'),
+                         'https://a.test/b.js': ('text/javascript', b'same')})
+    manifest, names = read_manifest(path)
+
+    assert manifest['format'] == 4
+    members = {entry['member'] for entry in manifest['assets'].values()}
+    assert len(members) == 1
+    assert sorted(name for name in names if name.startswith('blobs/')) == sorted(
+        members | {manifest['pages']['https://a.test/']['member']})
+
+
+def test_checkpoint_due_after_ten_new_pages_or_a_minute(site_downloader):
+    now = time.time()
+    assert not site_downloader.checkpoint_due(9, 0, now)
+    assert site_downloader.checkpoint_due(10, 0, now)
+    # Failed pages don't advance the count, so a checkpoint at 10 isn't repeated
+    assert not site_downloader.checkpoint_due(10, 10, now)
+    assert site_downloader.checkpoint_due(23, 13, now)
+    assert site_downloader.checkpoint_due(11, 10, now - 61)
+
+
+def test_checkpoint_round_trip(downloader, site_downloader):
+    filepath = os.path.join(site_downloader.output_dir, 'a.test_RELAXED_1.page')
+    site_downloader.archive_writer = downloader.PageArchiveWriter(
+        filepath, site_downloader.get_staging_dir(filepath))
+    site_downloader.pages_to_crawl.extend(['https://a.test/3'])
+    site_downloader.visited_urls.update(['https://a.test/', 'https://a.test/2', 'https://a.test/3'])
+    site_downloader.failed_urls.add('https://a.test/broken')
+    content = {'timestamp': 123}
+
+    site_downloader.save_checkpoint('https://a.test/', content, 5, pending=['https://a.test/2'])
+    site_downloader.archive_writer.journal.close()
+
+    checkpoint = site_downloader.find_resumable_crawl('https://a.test/')
+    assert checkpoint['crawled_pages'] == 5
+    assert checkpoint['timestamp'] == 123
+    assert checkpoint['filename'] == 'a.test_RELAXED_1.page'
+    # Pages in flight when the checkpoint was taken are crawled first
+    assert checkpoint['frontier'] == ['https://a.test/2', 'https://a.test/3']
+    assert checkpoint['failed'] == ['https://a.test/broken']
+    assert checkpoint['staging_dir'] == site_downloader.archive_writer.staging_dir
+    assert site_downloader.find_resumable_crawl('https://a.test/other') is None
+
+
+def test_resumed_writer_rebuilds_manifest_from_journal(downloader, tmp_path):
+    filepath = str(tmp_path / 'a.page')
+    staging_dir = str(tmp_path / '.staging' / 'a')
+    writer = downloader.PageArchiveWriter(filepath, staging_dir)
+    writer.add_page('https://a.test/', {'content': '<p>one</p>'})
+    writer.add_asset('https://a.test/s.css', {'content_type': 'text/css'}, b'body{}')
+    lost = writer.add_asset('https://a.test/lost.js', {'content_type': 'text/javascript'}, b'lost')
+    # A crash mid-write leaves a partial record, and a blob that never made it to disk
+    writer.journal.write('{"kind": "pages", "url": "https://a.test/cut')
+    writer.journal.close()
+    os.remove(writer.member_path(lost['member']))
+
+    resumed = downloader.PageArchiveWriter(filepath, staging_dir)
+    assert set(resumed.manifest['pages']) == {'https://a.test/'}
+    assert set(resumed.manifest['assets']) == {'https://a.test/s.css'}
+
+    resumed.add_page('https://a.test/2', {'content': '<p>two</p>'})
+    resumed.finalize({'main_url': 'https://a.test/'})
+    manifest, _ = read_manifest(filepath)
+    assert set(manifest['pages']) == {'https://a.test/', 'https://a.test/2'}
+    assert not os.path.exists(staging_dir)
+
+
+def save_previous_crawl(downloader, tmp_path, base_url, etag):
+    filepath = str(tmp_path / 'previous.page')
+    writer = downloader.PageArchiveWriter(filepath, str(tmp_path / '.staging' / 'previous'))
+    headers = {'etag': etag, 'last-modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    writer.add_page(base_url + '/', {'content': '<p>stored</p>', 'content_type': 'text/html',
+                                     'headers': headers})
+    writer.add_asset(base_url + '/app.js', {'content_type': 'text/javascript', 'headers': {'etag': etag}},
+                     b'stored-asset')
+    return writer.finalize({'main_url': base_url + '/'})
+
+
+def test_previous_archive_provides_conditional_headers(downloader, tmp_path):
+    path = save_previous_crawl(downloader, tmp_path, 'https://a.test', '"v1"')
+    previous = downloader.PreviousPageArchive(path)
+    try:
+        assert previous.get_conditional_headers('pages', 'https://a.test/') == {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+        assert previous.get_conditional_headers('assets', 'https://a.test/new.js') == {}
+    finally:
+        previous.close()
+
+
+def test_not_modified_responses_reuse_the_previous_bodies(downloader, site_downloader, validating_server,
+                                                           tmp_path):
+    site_downloader.previous_archive = downloader.PreviousPageArchive(
+        save_previous_crawl(downloader, tmp_path, validating_server, '"v1"'))
+    try:
+        page = site_downloader.download_page_enhanced(validating_server + '/')
+        asset = site_downloader.download_asset_complete(validating_server + '/app.js')
+    finally:
+        site_downloader.previous_archive.close()
+
+    assert page['content'] == '<p>stored</p>'
+    assert asset['content'] == b'stored-asset'
+    # The 304 refreshes the stored validators
+    assert page['headers']['cache-control'] == 'max-age=60'
+    assert site_downloader.reused_responses == 2
+
+
+def test_changed_responses_are_downloaded_again(downloader, site_downloader, validating_server, tmp_path):
+    site_downloader.previous_archive = downloader.PreviousPageArchive(
+        save_previous_crawl(downloader, tmp_path, validating_server, '"v0"'))
+    try:
+        page = site_downloader.download_page_enhanced(validating_server + '/')
+        asset = site_downloader.download_asset_complete(validating_server + '/app.js')
+    finally:
+        site_downloader.previous_archive.close()
+
+    assert page['content'] == '<p>fresh</p>'
+    assert page['headers']['etag'] == '"v2"'
+    assert asset['content'] == b'fresh-asset'
+    assert site_downloader.reused_responses == 0
+
+
+def test_update_without_rewritten_copies_drops_the_stale_ones(downloader, make_archive, tmp_path):
+    old_path = make_archive(tmp_path / 'old.page', 'https://a.test/',
+                            {'https://a.test/': '<a href="/b">b</a>'},
+                            {'https://a.test/s.css': ('text/css', b'a{background:url(x.png)}')},
+                            rewritten=True)
+    previous = downloader.PreviousPageArchive(old_path)
+    new_path = str(tmp_path / 'new.page')
+    writer = downloader.PageArchiveWriter(new_path, str(tmp_path / '.staging' / 'new'))
+    try:
+        page = previous.get_page('https://a.test/')
+        asset = previous.get_asset('https://a.test/s.css')
+        writer.add_page('https://a.test/', page)
+        writer.add_asset('https://a.test/s.css', asset, asset['content'])
+    finally:
+        previous.close()
+    writer.finalize({'main_url': 'https://a.test/'})
+
+    manifest, _ = read_manifest(new_path)
+    assert 'rewritten_member' not in manifest['pages']['https://a.test/']
+    assert 'rewritten_member' not in manifest['assets']['https://a.test/s.css']
+
+
+def test_failed_finalize_leaves_no_partial_archive(downloader, tmp_path):
+    filepath = str(tmp_path / 'a.page')
+    writer = downloader.PageArchiveWriter(filepath, str(tmp_path / '.staging' / 'a'))
+    entry = writer.add_page('https://a.test/', {'content': '<p>home</p>'})
+    os.remove(writer.member_path(entry['member']))
+
+    with pytest.raises(FileNotFoundError):
+        writer.finalize({'main_url': 'https://a.test/'})
+    assert not os.path.exists(filepath)
+    assert not os.path.exists(filepath + '.tmp')
+
+
+def test_crawl_delay_caps_the_host_below_min_rate(downloader):
+    limiter = downloader.HostRateLimiter(rate=2.0, max_rate=8.0, min_rate=0.2, burst=2)
+    limiter.set_crawl_delay('a.test', 10)
+    bucket = limiter.hosts['a.test']
+    assert bucket['rate'] == pytest.approx(0.1)
+    assert bucket['burst'] == 1
+
+    # Neither fast answers nor slowdowns move the host past its Crawl-delay
+    limiter.record('https://a.test/', 200, 0.1)
+    assert bucket['rate'] == pytest.approx(0.1)
+    limiter.record('https://a.test/', 429, 0.1, retry_after='1')
+    assert bucket['rate'] == pytest.approx(0.1)
+    # Other hosts keep the defaults
+    limiter.record('https://b.test/', 503, 0.1, retry_after='1')
+    assert limiter.hosts['b.test']['rate'] == pytest.approx(1.0)
+
+
+class StreamedResponse:
+    def __init__(self, chunks, headers=None):
+        self.chunks = chunks
+        self.headers = headers or {}
+        self.read_chunks = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.read_chunks += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+def test_read_body_enforces_the_size_cap_while_reading(downloader):
+    budget = downloader.TransferBudget()
+
+    response = StreamedResponse([b'a' * 10] * 3)
+    assert budget.read_body(response, max_bytes=30) == b'a' * 30
+    assert response.closed
+
+    response = StreamedResponse([b'a' * 10] * 100)
+    with pytest.raises(downloader.AssetTooLargeError):
+        budget.read_body(response, max_bytes=25)
+    assert response.read_chunks == 3
+    assert response.closed
+
+    # A declared Content-Length over the cap is refused before reading
+    response = StreamedResponse([b'a' * 10], {'content-length': '1000'})
+    with pytest.raises(downloader.AssetTooLargeError):
+        budget.read_body(response, max_bytes=25)
+    assert response.read_chunks == 0
+    assert response.closed
+
+
+def test_precompressed_members_are_stored_uncompressed(downloader):
+    assert downloader.member_compression('video.mp4') == zipfile.ZIP_STORED
+    assert downloader.member_compression('https://a.test/img/logo.PNG?v=2') == zipfile.ZIP_STORED
+    assert downloader.member_compression('blobs/abc', 'font/woff2') == zipfile.ZIP_STORED
+    assert downloader.member_compression('https://a.test/app.js', 'text/javascript') == zipfile.ZIP_DEFLATED